@@ -5,6 +5,10 @@ import os
 import time
 import typing
 import json
+import importlib
+import subprocess
+import hashlib
+import itertools
 
 
 from blend_converter import common
@@ -32,7 +36,58 @@ def get_program_label(entry: 'updater.Program_Entry'):
     return getattr(entry.program, 'label', 'NONE')
 
 
-def launch_converter(program_collections: typing.List[common.Program_Collection]):
+def get_program_cache_status(entry: 'updater.Program_Entry'):
+    return getattr(entry.program, 'cache_status', '')
+
+
+def configure_updater(updater: 'updater.Updater'):
+    """ Set the parallel execution limits, shared by the GUI and the headless runner. """
+
+    import psutil
+    physical_core_count = psutil.cpu_count(logical=False)
+
+    updater.total_max_parallel_executions = physical_core_count
+    updater.default_max_parallel_executions = physical_core_count
+    updater.set_max_parallel_executions_per_program_tag('gltf', physical_core_count)
+    updater.set_max_parallel_executions_per_program_tag('unreal', 1)
+
+    from . import scheduler
+
+    resource_policy = scheduler.Resource_Policy(updater)
+    resource_policy.start()
+
+    return resource_policy
+
+
+def feed_program_collections(main_frame, program_collections: typing.Iterator[common.Program_Collection], is_changed = False):
+    """
+    Add the program collections to the shown window one per GUI event, the stock UI reads all of its collections before showing the window.
+
+    Runs on the GUI thread. Once the stream ends, the programs of all the entries are loaded with `Updater.update_entries`.
+    """
+
+    import wx
+
+    from blend_converter import updater as bc_updater
+
+    # the window has been closed
+    if not main_frame:
+        return
+
+    program_collection = next(program_collections, None)
+
+    if program_collection is None:
+        if is_changed:
+            main_frame.updater.update_entries()
+        return
+
+    main_frame.updater.entries.extend(bc_updater.get_program_entries([program_collection]))
+    main_frame.result_panel.refresh()
+
+    wx.CallAfter(feed_program_collections, main_frame, program_collections, True)
+
+
+def launch_converter(program_collections: typing.Iterable[common.Program_Collection]):
 
     from blend_converter.gui import updater_ui
 
@@ -40,16 +95,23 @@ def launch_converter(program_collections: typing.List[common.Program_Collection]
     print('conversion app start:', time.strftime('%Y.%m.%d %H:%M:%S'))
     columns = [
         ('label', 170, get_program_label),
+        ('cache', 60, get_program_cache_status),
     ]
+
+    if isinstance(program_collections, list):
+        rest = []
+    else:
+        # a manifest stream, the window is shown after the first collection
+        rest = iter(program_collections)
+        program_collections = list(itertools.islice(rest, 1))
+
     app = updater_ui.Main_Frame.get_app(program_collections, columns)
 
-    import psutil
-    physical_core_count = psutil.cpu_count(logical=False)
+    configure_updater(app.main_frame.updater)
 
-    app.main_frame.updater.total_max_parallel_executions = physical_core_count
-    app.main_frame.updater.default_max_parallel_executions = physical_core_count
-    app.main_frame.updater.set_max_parallel_executions_per_program_tag('gltf', physical_core_count)
-    app.main_frame.updater.set_max_parallel_executions_per_program_tag('unreal', 1)
+    if rest:
+        import wx
+        wx.CallAfter(feed_program_collections, app.main_frame, rest)
 
     if not IS_USING_TERMINAL:
         sys.excepthook = sys.__excepthook__
@@ -57,51 +119,203 @@ def launch_converter(program_collections: typing.List[common.Program_Collection]
     app.MainLoop()
 
 
-def get_programs():
+class Lazy_Program:
+    """ A program registry entry that imports its module only when the functions are requested. """
+
+
+    def __init__(self, module: str, program_function: str = 'get_program', arguments_function: str = 'get_arguments'):
+        self.module = module
+        self.program_function = program_function
+        self.arguments_function = arguments_function
+
+
+    @property
+    def module_name(self):
+        return f'{__package__}.programs.{self.module}'
+
+
+    def load(self) -> typing.Tuple[typing.Callable, typing.Callable]:
+
+        module = importlib.import_module(self.module_name)
 
-    from .programs import bake
-    from .programs import godot_static
-    from .programs import godot_skeletal
-    from .programs import godot_animation
-    from .programs import unreal_static
-    from .programs import unreal_skeletal
-    from .programs import unreal_animation
-    from .programs import skin_test
-    from .programs import scan
-    from .programs import rig
-    from .programs import panda3d_static
-    from .programs import panda3d_skeletal
-    from .programs import fbx_static
-    from .programs import fbx_skeletal
-    from .programs import fbx_animation
+        return getattr(module, self.program_function), getattr(module, self.arguments_function)
+
+
+def get_programs():
 
     return dict(
-        static = [bake.get_program, bake.get_static_arguments],
-        skeletal = [bake.get_program, bake.get_skeletal_arguments],
-        godot_static = [godot_static.get_program, godot_static.get_arguments],
-        godot_skeletal = [godot_skeletal.get_program, godot_skeletal.get_arguments],
-        godot_animation = [godot_animation.get_program, godot_animation.get_arguments],
-        ue_static = [unreal_static.get_program, unreal_static.get_arguments],
-        ue_skeletal = [unreal_skeletal.get_program, unreal_skeletal.get_arguments],
-        ue_animation = [unreal_animation.get_program, unreal_animation.get_arguments],
-        skin_test = [skin_test.get_program, skin_test.get_arguments],
-        scan = [scan.get_program, scan.get_arguments],
-        rig = [rig.get_program, rig.get_arguments],
-        panda3d_static = [panda3d_static.get_program, panda3d_static.get_arguments],
-        panda3d_skeletal = [panda3d_skeletal.get_program, panda3d_skeletal.get_arguments],
-        fbx_static = [fbx_static.get_program, fbx_static.get_arguments],
-        fbx_skeletal = [fbx_skeletal.get_program, fbx_skeletal.get_arguments],
-        fbx_animation = [fbx_animation.get_program, fbx_animation.get_arguments],
+        static = Lazy_Program('bake', arguments_function = 'get_static_arguments'),
+        skeletal = Lazy_Program('bake', arguments_function = 'get_skeletal_arguments'),
+        godot_static = Lazy_Program('godot_static'),
+        godot_skeletal = Lazy_Program('godot_skeletal'),
+        godot_animation = Lazy_Program('godot_animation'),
+        ue_static = Lazy_Program('unreal_static'),
+        ue_skeletal = Lazy_Program('unreal_skeletal'),
+        ue_animation = Lazy_Program('unreal_animation'),
+        skin_test = Lazy_Program('skin_test'),
+        scan = Lazy_Program('scan'),
+        rig = Lazy_Program('rig'),
+        panda3d_static = Lazy_Program('panda3d_static'),
+        panda3d_skeletal = Lazy_Program('panda3d_skeletal'),
+        fbx_static = Lazy_Program('fbx_static'),
+        fbx_skeletal = Lazy_Program('fbx_skeletal'),
+        fbx_animation = Lazy_Program('fbx_animation'),
     )
 
 
-def load_program_collections():
+def get_import_time_report(module_names: typing.Iterable[str], top = 20):
+    """
+    Import the modules in a fresh interpreter with `-X importtime` and summarize the result.
+
+    Within the single process the modules share their dependencies, so the cumulative time of a module is the cost of importing it after the preceding ones.
+    """
+
+    module_names = list(dict.fromkeys(module_names))
+
+    code = '; '.join([
+        'from blend_converter import serialization',
+        f'serialization.import_module_from_file({ROOT!r}, {__package__!r})',
+        f'[__import__(name) for name in {module_names!r}]',
+    ])
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], stderr = subprocess.PIPE, text = True, encoding = 'utf-8')
+
+    records: typing.List[typing.Tuple[int, int, str]] = []
+    other_lines: typing.List[str] = []
+
+    for line in result.stderr.splitlines():
+
+        if not line.startswith('import time:') or 'self [us]' in line:
+            other_lines.append(line)
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', maxsplit = 2)
+        records.append((int(self_us), int(cumulative_us), name.strip()))
+
+    cumulative_map = {name: cumulative_us for _, cumulative_us, name in records}
+
+    lines = [f"Total: {sum(self_us for self_us, _, _ in records) / 1000:.1f} ms, {len(records)} modules"]
+
+    if result.returncode:
+        lines.append(f"Exit code: {result.returncode}")
+        lines.extend(other_lines)
+
+    lines.append('')
+    lines.append("Requested modules, cumulative ms:")
+    for name in module_names:
+        lines.append(f"{cumulative_map.get(name, 0) / 1000:10.1f}  {name}")
+
+    lines.append('')
+    lines.append(f"Top {top} modules by self time, ms:")
+    for self_us, _, name in sorted(records, reverse = True)[:top]:
+        lines.append(f"{self_us / 1000:10.1f}  {name}")
+
+    return '\n'.join(lines)
+
+
+MANIFEST_DIR = os.path.join(ROOT, 'manifests')
+
+MANIFEST_MAX_AGE = 30 * 24 * 60 * 60
+""" The manifests of the started apps are removed after not being used for that many seconds. """
+
+
+def write_manifest(program_collections: typing.Iterable[common.Program_Collection], is_pinned = False):
+    """
+    Write the program collections as JSON Lines, one `Program_Collection` per line.
+
+    The file name is derived from the content, so the same programs reuse the same manifest.
+
+    `is_pinned`: the manifest is referenced by a shortcut or a copied command and is never removed, otherwise it is removed by `remove_old_manifests`.
+    """
+
+    lines = [json.dumps(program_collection._to_dict()) + '\n' for program_collection in program_collections]
+
+    content = ''.join(lines).encode('utf-8')
+
+    prefix = 'pinned_manifest_' if is_pinned else 'manifest_'
+
+    path = os.path.join(MANIFEST_DIR, f"{prefix}{hashlib.sha1(content).hexdigest()[:16]}.jsonl")
+
+    if os.path.exists(path):
+        os.utime(path)
+    else:
+        os.makedirs(MANIFEST_DIR, exist_ok = True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    remove_old_manifests()
+
+    return path
+
+
+def remove_old_manifests(max_age = MANIFEST_MAX_AGE):
+    """ Remove the not pinned manifests that have not been written or read for `max_age` seconds. """
+
+    now = time.time()
+
+    for entry in os.scandir(MANIFEST_DIR):
+
+        if not (entry.name.startswith('manifest_') and entry.name.endswith('.jsonl')):
+            continue
+
+        try:
+            if now - entry.stat().st_mtime < max_age:
+                continue
+            os.remove(entry.path)
+        except OSError as e:
+            # still open by a running app on Windows
+            print(f"Cannot remove the old manifest: {e}")
+
+
+def iter_manifest(path: str):
+    """ Lazily read the program collections from a manifest file, an invalid line is skipped. """
+
+    with open(path, encoding = 'utf-8') as f:
+
+        for line_number, line in enumerate(f, start = 1):
+
+            if not line.strip():
+                continue
+
+            try:
+                program_collection = common.Program_Collection.from_dict(**json.loads(line))
+            except Exception as e:
+                print(f"Invalid manifest line skipped {path}:{line_number}: {e}")
+                continue
+
+            yield program_collection
+
+
+def load_program_collections() -> typing.Optional[typing.Iterable[common.Program_Collection]]:
 
     try:
         raw_argument = sys.argv[1]
     except IndexError:
         return None
 
+    return get_program_collections(raw_argument)
+
+
+def get_program_collections(raw_argument: str) -> typing.Optional[typing.Iterable[common.Program_Collection]]:
+    """ From a manifest file path or a JSON list. """
+
+    if os.path.isfile(raw_argument):
+
+        # keeps a manifest in use from being removed, e.g. for the restart of the app
+        try:
+            os.utime(raw_argument)
+        except OSError:
+            pass
+
+        program_collections = iter_manifest(raw_argument)
+
+        try:
+            first = next(program_collections)
+        except StopIteration:
+            return None
+
+        return itertools.chain([first], program_collections)
+
     try:
         argument = json.loads(raw_argument)
     except json.decoder.JSONDecodeError as e:
@@ -119,6 +333,10 @@ def load_program_collections():
 
 def main():
 
+    if sys.argv[1:2] == ['run']:
+        from . import headless
+        raise SystemExit(headless.main(sys.argv[2:]))
+
     print(sys.argv)
     print()
 
@@ -15,6 +15,8 @@ from blend_converter import settings_base
 from blend_converter.gui import program_ui
 from blend_converter.gui import wxp_utils
 
+from . import app
+
 
 ROOT = os.path.dirname(os.path.realpath(__file__))
 
@@ -319,7 +321,7 @@ def get_program_panel(parent: wx.Window, function: typing.Callable, program_name
 class Launcher(wx.Frame):
 
 
-    def __init__(self, programs: typing.Dict[str, typing.Tuple[typing.Callable, typing.Callable]]):
+    def __init__(self, programs: typing.Dict[str, app.Lazy_Program]):
 
         super().__init__(None, title = "Blend Converter GUI Launcher", size=(700, 800))
 
@@ -367,6 +369,10 @@ class Launcher(wx.Frame):
         button_sizer.Add(self.create_shortcut_button, 1, wx.EXPAND | wx.ALL, 5)
         self.create_shortcut_button.Enable(False)
 
+        self.import_time_button = wx.Button(self, label = 'Import Times')
+        self.import_time_button.Bind(wx.EVT_BUTTON, self.on_import_time_report)
+        button_sizer.Add(self.import_time_button, 1, wx.EXPAND | wx.ALL, 5)
+
 
         program_selector_sizer = wx.BoxSizer(wx.HORIZONTAL)
         sizer.Add(program_selector_sizer, 0, wx.EXPAND | wx.ALL)
@@ -406,17 +412,18 @@ class Launcher(wx.Frame):
             panel: Program = sizer_item.GetWindow()
 
             kwargs = {key: value.GetValue() for key, value in panel.widget_map.items()}
-            result.append(common.Program_Collection.from_callable(*self.programs[panel.program_name], kwargs=kwargs))
+            result.append(common.Program_Collection.from_callable(*self.programs[panel.program_name].load(), kwargs=kwargs))
 
         return result
 
 
-    def get_command(self):
+    def get_command(self, is_pinned = False):
+        """ `is_pinned`: the command is kept by the user, see `app.write_manifest`. """
 
         return [
             sys.executable,
             os.path.join(ROOT, 'start.py'),
-            json.dumps(self.get_program_collections(), default = lambda x: x._to_dict()),
+            app.write_manifest(self.get_program_collections(), is_pinned),
         ]
 
 
@@ -436,7 +443,7 @@ class Launcher(wx.Frame):
 
         import pyperclip
 
-        pyperclip.copy(utils.get_command_from_list(self.get_command()))
+        pyperclip.copy(utils.get_command_from_list(self.get_command(is_pinned = True)))
 
 
     def on_create_shortcut(self, event):
@@ -461,7 +468,7 @@ class Launcher(wx.Frame):
 
         from blend_converter.windows import win_utils
 
-        command = self.get_command()
+        command = self.get_command(is_pinned = True)
 
         target_path = command[0]
         arguments = subprocess.list2cmdline(command[1:])
@@ -478,6 +485,19 @@ class Launcher(wx.Frame):
         self.save_history()
 
 
+    def on_import_time_report(self, event):
+
+        import wx.lib.dialogs
+
+        with wx.BusyCursor():
+            report = app.get_import_time_report(program.module_name for program in self.programs.values())
+
+        print(report)
+
+        with wx.lib.dialogs.ScrolledMessageDialog(self, report, "Import Times", size = (700, 600)) as dialog:
+            dialog.ShowModal()
+
+
     def write_config(self):
 
         with open(self.config_file, 'w') as f:
@@ -527,7 +547,7 @@ class Launcher(wx.Frame):
         program_name = self.program_selector.GetValue()
         self.program_selector.SetSelection(-1)
 
-        panel = get_program_panel(self.scroll_panel, self.programs[program_name][1], program_name)
+        panel = get_program_panel(self.scroll_panel, self.programs[program_name].load()[1], program_name)
 
         self.load_history(panel)
 
@@ -1,11 +1,31 @@
 import os
 import typing
 import re
+import functools
+import json
+import time
+import atexit
+import threading
+import concurrent.futures
 
 
 from blend_converter import utils as bc_utils
 
 
+ASCII_UNDERSCORED_PATTERN = re.compile(
+    r'[^a-zA-Z0-9]+'
+    r'|(?<=[A-Za-z])(?=[0-9])'
+    r'|(?<=[0-9])(?=[A-Za-z])'
+    r'|(?<=[A-Z])(?=[A-Z][a-z])'
+    r'|(?<=[a-z])(?=[A-Z])'
+)
+"""
+Matches either a run of non-alphanumeric characters or an empty word boundary:
+`ab1` → `ab_1`, `1ab` → `1_ab`, `HTMLParser` → `HTML_Parser`, `camelCase` → `camel_Case`.
+"""
+
+
+@functools.lru_cache(maxsize = 8192)
 def get_ascii_underscored(string: str):
     r"""
     For creating slug names in the Unreal Engine style.
@@ -13,12 +33,7 @@ def get_ascii_underscored(string: str):
     >A folder name may not contain any of the following characters: \:*?"<>l',.&!~@#/[]
     """
 
-    string = re.sub(r'([A-Za-z]+)(\d+)', r'\1_\2', string)
-    string = re.sub(r'(\d+)([A-Za-z]+)', r'\1_\2', string)
-    string = re.sub(r'([A-Z]+)([A-Z][a-z0-9])', r'\1_\2', string)
-    string = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', string)
-    string = re.sub(r'[^a-zA-Z0-9]+', '_', string)
-    string = re.sub(r'_+', '_', string)
+    string = ASCII_UNDERSCORED_PATTERN.sub('_', string)
     string = string.strip('_')
     string = string.lower()
     string = bc_utils.ensure_valid_basename(string)
@@ -30,16 +45,10 @@ class Folder:
     UNREAL_STATIC = '/Game/blend_converter/static/'
     UNREAL_SKELETAL = '/Game/blend_converter/skeletal/'
     UNREAL_ANIMATION = '/Game/blend_converter/animations/'
+    UNREAL_SHARED_TEXTURES = '/Game/blend_converter/shared_textures/'
 
 
 
-def get_folders(folder: os.PathLike):
-    if os.path.exists(folder):
-        return [file for file in os.scandir(folder) if file.is_dir() and not file.name.startswith('_')]
-    else:
-        return []
-
-
 EXT_LENGTH = len('.blend')
 
 
@@ -58,14 +67,200 @@ def sort_by_name(file: os.DirEntry):
     return (parts, -len(name))
 
 
+class Folder_Entry:
+    """ A stand-in for `os.DirEntry` of a folder returned from the discovery index. """
+
+    __slots__ = ('name', 'path')
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name!r}>"
+
+    def is_dir(self):
+        return True
+
+    def is_file(self):
+        return False
+
+
+DISCOVERY_INDEX_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'discovery_index.json')
+
+DISCOVERY_INDEX_VERSION = 1
+
+RACY_MTIME_NS = 2 * 10**9
+""" A folder modified this close to its scan time is rescanned as its mtime might not have ticked yet, e.g. FAT has a 2 seconds resolution. """
+
+
+class Discovery_Index:
+    """
+    An on-disk cache of the source folder listings keyed by the folder mtime.
+
+    Adding, removing or renaming an entry updates the mtime of the containing folder, so only the changed folders are rescanned.
+    """
+
+
+    def __init__(self, path: typing.Optional[str] = DISCOVERY_INDEX_PATH):
+
+        self.path = path
+        self.entries: typing.Dict[str, dict] = {}
+        self.is_changed = False
+        self.lock = threading.Lock()
+
+        if path:
+            self.load()
+
+
+    def load(self):
+
+        try:
+            with open(self.path, encoding = 'utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') != DISCOVERY_INDEX_VERSION:
+            return
+
+        self.entries = data['entries']
+
+
+    def save(self):
+
+        if not self.path or not self.is_changed:
+            return
+
+        with self.lock:
+            data = dict(version = DISCOVERY_INDEX_VERSION, entries = dict(self.entries))
+            self.is_changed = False
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        try:
+            with open(temp_path, 'w', encoding = 'utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Cannot save the discovery index: {e}")
+
+
+    def scan(self, folder: str, mtime_ns: int):
+
+        folders = []
+        blends = []
+
+        scan_time_ns = time.time_ns()
+
+        for file in os.scandir(folder):
+            if file.is_dir():
+                if not file.name.startswith('_'):
+                    folders.append(file.name)
+            elif file.is_file() and file.name.lower().endswith('.blend'):
+                blends.append(file)
+
+        return dict(
+            mtime_ns = mtime_ns,
+            scan_time_ns = scan_time_ns,
+            folders = folders,
+            blend = max(blends, key = sort_by_name).name if blends else None,
+        )
+
+
+    def get_entry(self, folder: os.PathLike):
+
+        key = os.path.normcase(os.path.abspath(folder))
+
+        mtime_ns = os.stat(folder).st_mtime_ns
+
+        entry = self.entries.get(key)
+
+        if entry and entry['mtime_ns'] == mtime_ns and entry['scan_time_ns'] - mtime_ns > RACY_MTIME_NS:
+            return entry
+
+        entry = self.scan(folder, mtime_ns)
+
+        with self.lock:
+            self.entries[key] = entry
+            self.is_changed = True
+
+        return entry
+
+
+    def get_folders(self, folder: os.PathLike):
+
+        folder = os.fspath(folder)
+
+        if not os.path.isdir(folder):
+            return []
+
+        return [Folder_Entry(name, os.path.join(folder, name)) for name in self.get_entry(folder)['folders']]
+
+
+    def get_blend(self, folder: os.PathLike):
+
+        folder = os.fspath(folder)
+
+        name = self.get_entry(folder)['blend']
+        if name is None:
+            return None
+
+        return os.path.join(folder, name)
+
+
+_discovery_index: typing.Optional[Discovery_Index] = None
+
+
+def get_discovery_index():
+    """ The index shared by all the program kinds, saved on exit. """
+
+    global _discovery_index
+
+    if _discovery_index is None:
+        _discovery_index = Discovery_Index()
+        atexit.register(_discovery_index.save)
+
+    return _discovery_index
+
+
+def get_folders(folder: os.PathLike):
+    return get_discovery_index().get_folders(folder)
+
+
 def get_blend(folder: str):
+    return get_discovery_index().get_blend(folder)
+
+
+SCAN_MAX_WORKERS = 16
+""" The scanning is I/O bound, so the thread count is not tied to the CPU count. """
+
+
+def get_nested_blends(root: os.PathLike, max_workers = SCAN_MAX_WORKERS):
+    """
+    Find the blends of a `root/rig/animation/*.blend` tree, scanning the folders in parallel.
+
+    Returns a list of `(rig_folder, animation_folder, blend_path)` in the same order as the serial `get_folders` and `get_blend` walk, skipping the folders without a blend.
+    """
+
+    rig_folders = get_folders(root)
+    if not rig_folders:
+        return []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
 
-    files = [f for f in os.scandir(folder) if f.is_file() and f.name.lower().endswith('.blend')]
+        pairs = [
+            (rig_folder, anim_folder)
+            for rig_folder, anim_folders in zip(rig_folders, executor.map(get_folders, rig_folders))
+            for anim_folder in anim_folders
+        ]
 
-    if not files:
-        return None
+        blends = executor.map(get_blend, [anim_folder for _, anim_folder in pairs])
 
-    return max(files, key = sort_by_name).path
+        return [(rig_folder, anim_folder, blend_path) for (rig_folder, anim_folder), blend_path in zip(pairs, blends) if blend_path]
 
 
 IGNORE_PREFIX = ('#', '__bc')
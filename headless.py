@@ -0,0 +1,139 @@
+"""
+Running the program collections without the GUI, e.g. on build farm nodes with no display.
+
+`python -m blend_converter_template run manifest.jsonl`
+
+Progress is printed to stdout as JSON Lines, everything else goes to stderr.
+"""
+
+import sys
+import json
+import time
+import typing
+import contextlib
+
+from blend_converter import common
+from blend_converter import communication
+from blend_converter import updater as bc_updater
+
+from . import app
+
+
+FINAL_STATUSES = {
+    bc_updater.Status.OK,
+    bc_updater.Status.ERROR,
+    bc_updater.Status.DOES_NOT_EXIST,
+    bc_updater.Status.WAITING_FOR_DEPENDENCY,
+}
+""" A waiting entry is final when nothing else is running, as its dependency has failed. """
+
+POLL_INTERVAL = 0.5
+
+SETTLE_POLLS = 4
+""" The updater pokes and despatches the dependants asynchronously, so the final state must hold for several polls. """
+
+
+class Progress_Printer:
+
+
+    def __init__(self, entries: typing.List[bc_updater.Program_Entry], stream: typing.TextIO):
+        self.entries = entries
+        self.stream = stream
+        self.statuses: typing.Dict[str, str] = {}
+
+
+    def print(self, **kwargs):
+        self.stream.write(json.dumps(kwargs, ensure_ascii = False) + '\n')
+        self.stream.flush()
+
+
+    def update(self):
+
+        for index, entry in enumerate(self.entries):
+
+            if self.statuses.get(entry.entry_id) == entry.status:
+                continue
+
+            self.statuses[entry.entry_id] = entry.status
+
+            self.print(
+                event = 'status',
+                index = index,
+                status = entry.status,
+                label = app.get_program_label(entry),
+                cache = app.get_program_cache_status(entry),
+                blend_path = entry.program.blend_path,
+                result_path = entry.program.result_path,
+            )
+
+
+def is_finished(entries: typing.List[bc_updater.Program_Entry]):
+    return all(entry.status in FINAL_STATUSES for entry in entries)
+
+
+def run(program_collections: typing.Iterable[common.Program_Collection], stream: typing.TextIO):
+    """ Returns the exit code: `0` if all the programs are up to date. """
+
+    entries = bc_updater.get_program_entries(program_collections)
+
+    printer = Progress_Printer(entries, stream)
+    printer.print(event = 'start', total = len(entries), time = time.strftime('%Y.%m.%d %H:%M:%S'))
+
+    if not entries:
+        printer.print(event = 'summary', total = 0, statuses = {})
+        return 1
+
+    updater = bc_updater.Updater.from_entries(entries)
+    updater.is_paused = False
+
+    resource_policy = app.configure_updater(updater)
+
+    updater.update_entries()
+
+    settled_polls = 0
+
+    while settled_polls < SETTLE_POLLS:
+
+        time.sleep(POLL_INTERVAL)
+
+        printer.update()
+
+        if is_finished(entries):
+            settled_polls += 1
+        else:
+            settled_polls = 0
+
+    resource_policy.stop()
+
+    updater.updater_command_queue.put({communication.Key.COMMAND: communication.Command.SHUTDOWN})
+    updater.terminate_observer()
+    updater.program_getting_pool.terminate()
+
+    statuses: typing.Dict[str, int] = {}
+    cache_statuses: typing.Dict[str, int] = {}
+    for entry in entries:
+        statuses[entry.status] = statuses.get(entry.status, 0) + 1
+        cache_status = app.get_program_cache_status(entry)
+        if cache_status:
+            cache_statuses[cache_status] = cache_statuses.get(cache_status, 0) + 1
+
+    printer.print(event = 'summary', total = len(entries), statuses = statuses, cache = cache_statuses)
+
+    return 0 if statuses.get(bc_updater.Status.OK, 0) == len(entries) else 1
+
+
+def main(argv: typing.List[str]):
+
+    stream = sys.stdout
+
+    if len(argv) != 1:
+        print("Usage: python -m blend_converter_template run <manifest.jsonl | json>", file = sys.stderr)
+        return 2
+
+    with contextlib.redirect_stdout(sys.stderr):
+
+        program_collections = app.get_program_collections(argv[0])
+        if program_collections is None:
+            return 2
+
+        return run(program_collections, stream)
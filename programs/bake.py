@@ -1,6 +1,9 @@
 import os
+import json
+import typing
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import custom_per_blend
@@ -13,6 +16,118 @@ def get_texture_prefix(folder_name: str):
     return configuration.get_ascii_underscored(folder_name)
 
 
+def get_checkpoint_dir(result_path: str):
+    return os.path.join(os.path.dirname(result_path), '_checkpoints')
+
+
+def add_checkpoint(program, blender, checkpoint_dir: str, name: str):
+    """ Save an intermediate blend keyed on the inputs and the instructions so far. """
+
+    from blend_converter import common
+
+    path = os.path.join(checkpoint_dir, name + '.blend')
+    key = result_cache.get_key(program)
+
+    return_values = {instruction.identifier: {common.K_INSTRUCTION_IDENTIFIER: instruction.identifier} for instruction in program.instructions}
+
+    program.run(blender, scripts_bake.save_checkpoint, path, key, return_values)
+
+    return dict(path = path, key = key, index = len(program.instructions))
+
+
+def get_referenced_identifiers(value, identifiers: set):
+
+    from blend_converter import common
+
+    if isinstance(value, dict):
+
+        identifier = value.get(common.K_INSTRUCTION_IDENTIFIER)
+        if identifier is not None:
+            identifiers.add(identifier)
+            return identifiers
+
+        for sub_value in value.values():
+            get_referenced_identifiers(sub_value, identifiers)
+
+    elif isinstance(value, (list, tuple)):
+        for sub_value in value:
+            get_referenced_identifiers(sub_value, identifiers)
+
+    elif hasattr(value, '_to_dict'):
+        get_referenced_identifiers(value._to_dict(), identifiers)
+
+    return identifiers
+
+
+def get_resumed_instructions(program, blender, checkpoint: dict):
+    """ Open the checkpoint and substitute the return values of the skipped instructions. """
+
+    from blend_converter import common
+
+    instructions = program.instructions[checkpoint['index']:]
+
+    identifiers = set()
+    for instruction in instructions:
+        get_referenced_identifiers([instruction.args, instruction.kwargs], identifiers)
+
+    identifiers.difference_update(instruction.identifier for instruction in instructions)
+
+    checkpoint['identifiers'] = identifiers
+
+    return [
+        common.Instruction('open_checkpoint', blender, scripts_bake.open_checkpoint, checkpoint['path'], checkpoint['key']),
+        *(common.Instruction(identifier, blender, scripts_bake.get_checkpoint_value, identifier) for identifier in sorted(identifiers)),
+        *instructions,
+    ]
+
+
+def is_checkpoint_valid(checkpoint: dict):
+
+    try:
+        with open(checkpoint['path'] + '.json', encoding = 'utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if data['key'] != checkpoint['key']:
+        return False
+
+    return os.path.exists(checkpoint['path']) and checkpoint['identifiers'].issubset(data['values'])
+
+
+def resume_from_checkpoint(program, blender, checkpoints: typing.List[dict]):
+    """
+    Replace the instructions preceding the latest valid checkpoint.
+
+    If the previous execution has been resumed the same way and its checkpoint is still valid, the same instructions are kept so the program is not seen as changed.
+    """
+
+    prev_report_diff = program.get_prev_report_diff()
+
+    full_instructions = program.instructions
+    resumed_instructions = [get_resumed_instructions(program, blender, checkpoint) for checkpoint in checkpoints]
+
+    program.instructions = full_instructions
+    if program.get_next_report_diff() == prev_report_diff:
+        return
+
+    for checkpoint, instructions in zip(checkpoints, resumed_instructions):
+        program.instructions = instructions
+        if program.get_next_report_diff() == prev_report_diff:
+            if is_checkpoint_valid(checkpoint):
+                return
+            # e.g. deleted or of another copy of the project
+            break
+
+    for checkpoint, instructions in reversed(list(zip(checkpoints, resumed_instructions))):
+        if is_checkpoint_valid(checkpoint):
+            print(f"Resuming from checkpoint: {checkpoint['path']}")
+            program.instructions = instructions
+            return
+
+    program.instructions = full_instructions
+
+
 def get_program(
             blender_executable: str,
             blend_path,
@@ -20,8 +135,25 @@ def get_program(
             textures_folder: str,
             is_skeletal: bool,
             skip_bake: bool = False,
+            use_result_cache: bool = True,
+            use_checkpoints: bool = False,
+            bake_shard_count: int = 1,
+            texel_density: int = 0,
+            max_resolution: int = 4096,
         ):
-    """ Convert to an exportable blend file, e.g. bake materials, apply modifiers. """
+    """
+    Convert to an exportable blend file, e.g. bake materials, apply modifiers.
+
+    `use_checkpoints`: save intermediate blends after unwrapping and packing, so a failed execution resumes from the latest one.
+
+    `bake_shard_count`: split the bake between that many Blender processes, see `scripts_bake.bake_sharded`.
+
+    `texel_density`: if not `0`, the pixels per meter the bake resolution is computed from, instead of the fixed resolution.
+    The resolution is a power of two up to `max_resolution`.
+
+    The fixed resolution comes from the `scripts_bake.get_*_resolution` instructions, which can be set per blend in `bc_instructions.ini`.
+    `texel_density` takes priority: every bake task, including the alpha one, gets the computed resolution, and the fixed one is only used as the unwrap texture resolution.
+    """
 
     from blend_converter.blender.executor import Blender
     from blend_converter.blender import bpy_uv
@@ -37,6 +169,9 @@ def get_program(
 
     print(result_path)
 
+    checkpoint_dir = get_checkpoint_dir(result_path)
+    checkpoints: typing.List[dict] = []
+
     blender = Blender(blender_executable, timeout = 30 * 60)
 
     program = common.Program(
@@ -46,6 +181,8 @@ def get_program(
         settings_path = os.path.join(blend_path.dir, 'bc_instructions.ini'),
     )
 
+    program.tags.add('bake')
+
     if is_skeletal:
         program.label = 'BAKE SKELETAL 🍪'
     else:
@@ -108,6 +245,9 @@ def get_program(
 
     program.run(blender, bpy_uv.reunwrap_bad_uvs, objects, uv_layer_name = uv_layer_name, is_instruction_enabled = not skip_bake)
 
+    if use_checkpoints and not skip_bake:
+        checkpoints.append(add_checkpoint(program, blender, checkpoint_dir, 'unwrap'))
+
     program.run(blender, scripts_bake.apply_post_unwrap_modifiers, objects, is_skeletal)
 
     program.run(blender, bpy_utils.bisect_by_mirror_modifiers, objects, is_instruction_enabled = not skip_bake)
@@ -115,16 +255,24 @@ def get_program(
     program.run(blender, bpy_uv.scale_uv_to_world_per_uv_island, objects, uv_layer_name, is_instruction_enabled = not skip_bake)
     program.run(blender, bpy_uv.scale_uv_to_world_per_uv_layout, objects, uv_layer_name, is_instruction_enabled = not skip_bake)
 
+    bake_materials_settings = tool_settings.S_Bake_Materials(
+        image_dir = textures_folder,
+        uv_layer_name = uv_layer_name,
+        width = x_resolution,
+        height = y_resolution,
+        alpha_width = alpha_x_resolution,
+        alpha_height = alpha_y_resolution,
+    )
+
+    # the bake and pack resolution is overridden per task, the fixed one above is not used for them
+    if texel_density:
+        bake_materials_settings.use_texel_density = True
+        bake_materials_settings.texel_density = texel_density
+        bake_materials_settings.max_resolution = max_resolution
+
     tasks = program.run(blender, bpy_utils.pack_and_task,
         objects,
-        tool_settings.S_Bake_Materials(
-            image_dir = textures_folder,
-            uv_layer_name = uv_layer_name,
-            width = x_resolution,
-            height = y_resolution,
-            alpha_width = alpha_x_resolution,
-            alpha_height = alpha_y_resolution,
-        ),
+        bake_materials_settings,
         bake_settings = tool_settings.S_Bake(
             texture_name_prefix = get_texture_prefix(blend_path.dir_name),
             uv_layer_name = uv_layer_name,
@@ -139,9 +287,15 @@ def get_program(
         is_instruction_enabled = not skip_bake,
     )
 
+    if use_checkpoints and not skip_bake:
+        checkpoints.append(add_checkpoint(program, blender, checkpoint_dir, 'pack'))
+
     pre_bake_labels = program.run(blender, bpy_utils.label_mix_shader_nodes, objects, is_instruction_enabled = not skip_bake)
 
-    program.run(blender, bpy_utils.copy_and_bake, objects, tasks, pre_bake_labels = pre_bake_labels, is_instruction_enabled = not skip_bake)
+    if bake_shard_count > 1:
+        program.run(blender, scripts_bake.bake_sharded, objects, tasks, pre_bake_labels = pre_bake_labels, shard_count = bake_shard_count, is_instruction_enabled = not skip_bake)
+    else:
+        program.run(blender, bpy_utils.copy_and_bake, objects, tasks, pre_bake_labels = pre_bake_labels, is_instruction_enabled = not skip_bake)
 
     program.run(blender, bpy_utils.assign_new_materials, objects, tasks, is_instruction_enabled = not skip_bake)
 
@@ -162,11 +316,22 @@ def get_program(
     program.run(blender, scripts_bake.make_paths_relative, is_instruction_enabled = not skip_bake)
     program.run(blender, bpy_data.save_as_mainfile, result_path)
 
+    if checkpoints:
+        program.run(blender, scripts_bake.remove_checkpoints, checkpoint_dir)
+
+    # a resumed execution has the same result as the full one
+    cache_key = result_cache.get_key(program) if use_result_cache else None
+
+    if checkpoints:
+        resume_from_checkpoint(program, blender, checkpoints)
+
+    if use_result_cache:
+        result_cache.use(program, extra_outputs = [] if skip_bake or not textures_folder else [textures_folder], key = cache_key)
 
     return program
 
 
-def get_kwargs(blender_executable: str, blend_path: os.PathLike, result_root: str, resource_result_root: str, is_skeletal: bool):
+def get_kwargs(blender_executable: str, blend_path: os.PathLike, result_root: str, resource_result_root: str, is_skeletal: bool, use_checkpoints = False, bake_shard_count = 1, texel_density = 0, max_resolution = 4096):
 
     dir_name = os.path.basename(os.path.dirname(blend_path))
 
@@ -180,6 +345,10 @@ def get_kwargs(blender_executable: str, blend_path: os.PathLike, result_root: st
         result_root = result_root,
         textures_folder = texture_folder,
         is_skeletal = is_skeletal,
+        use_checkpoints = use_checkpoints,
+        bake_shard_count = bake_shard_count,
+        texel_density = texel_density,
+        max_resolution = max_resolution,
     )
 
 
@@ -187,6 +356,10 @@ def get_static_arguments(
             blender_executable: str,
             source_root: str,
             result_root: str,
+            use_checkpoints: bool = False,
+            bake_shard_count: int = 1,
+            texel_density: int = 0,
+            max_resolution: int = 4096,
         ):
 
 
@@ -201,7 +374,7 @@ def get_static_arguments(
         if not blend_path:
             continue
 
-        arguments.append(get_kwargs(blender_executable, blend_path, result_root, result_root, False))
+        arguments.append(get_kwargs(blender_executable, blend_path, result_root, result_root, False, use_checkpoints, bake_shard_count, texel_density, max_resolution))
 
 
     return arguments
@@ -211,6 +384,10 @@ def get_skeletal_arguments(
             blender_executable: str,
             source_root: str,
             result_root: str,
+            use_checkpoints: bool = False,
+            bake_shard_count: int = 1,
+            texel_density: int = 0,
+            max_resolution: int = 4096,
         ):
 
 
@@ -222,7 +399,7 @@ def get_skeletal_arguments(
         if not blend_path:
             continue
 
-        arguments.append(get_kwargs(blender_executable, blend_path, result_root, result_root, True))
+        arguments.append(get_kwargs(blender_executable, blend_path, result_root, result_root, True, use_checkpoints, bake_shard_count, texel_density, max_resolution))
 
 
     return arguments
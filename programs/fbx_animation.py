@@ -1,6 +1,7 @@
 import os
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -61,7 +62,7 @@ def get_program(
         add_leaf_bones = False,
     ))
 
-    return program
+    return result_cache.use(program)
 
 
 def get_arguments(
@@ -73,25 +74,18 @@ def get_arguments(
 
     arguments = []
 
-    for rig_folder in configuration.get_folders(source_root):
+    for rig_folder, anim_folder, blend_path in configuration.get_nested_blends(source_root):
 
         rig_name = os.path.basename(rig_folder)
-
-        for anim_folder in configuration.get_folders(rig_folder):
-
-            animation_name = os.path.basename(anim_folder)
-
-            blend_path = configuration.get_blend(anim_folder)
-            if not blend_path:
-                continue
-
-            arguments.append(dict(
-                blender_executable = blender_executable,
-                blend_path = blend_path,
-                rig_name = rig_name,
-                animation_name = animation_name,
-                result_root = result_root,
-            ))
+        animation_name = os.path.basename(anim_folder)
+
+        arguments.append(dict(
+            blender_executable = blender_executable,
+            blend_path = blend_path,
+            rig_name = rig_name,
+            animation_name = animation_name,
+            result_root = result_root,
+        ))
 
 
     return arguments
@@ -1,6 +1,7 @@
 import os
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -76,7 +77,7 @@ def get_program(
         bake_anim = False,
     ))
 
-    return program
+    return result_cache.use(program)
 
 
 def get_arguments(
@@ -1,6 +1,7 @@
 import os
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -63,7 +64,7 @@ def get_program(
 
     program.run(blender, bpy_export.export_fbx, fbx_path, bpy_export.S_Fbx())
 
-    return program
+    return result_cache.use(program)
 
 
 def get_arguments(
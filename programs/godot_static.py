@@ -3,6 +3,7 @@ import os
 
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -58,7 +59,7 @@ def get_program(
 
     program.run(blender, scripts_godot.set_gd_import_script, gltf_path, '', is_instruction_enabled = False)
 
-    return program
+    return result_cache.use(program, extra_outputs = [os.path.dirname(gltf_path)])
 
 
 def get_arguments(
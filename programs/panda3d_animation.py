@@ -2,6 +2,7 @@ import os
 import sys
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -65,7 +66,7 @@ def get_program(
     program.run(python, scripts_panda3d.run_gltf2bam, gltf_path, bam_path, settings)
 
 
-    return program
+    return result_cache.use(program, extra_outputs = [bam_path])
 
 
 def get_arguments(
@@ -78,26 +79,19 @@ def get_arguments(
 
     arguments = []
 
-    for rig_folder in configuration.get_folders(source_root):
+    for rig_folder, anim_folder, blend_path in configuration.get_nested_blends(source_root):
 
         rig_name = os.path.basename(rig_folder)
-
-        for anim_folder in configuration.get_folders(rig_folder):
-
-            animation_name = os.path.basename(anim_folder)
-
-            blend_path = configuration.get_blend(anim_folder)
-            if not blend_path:
-                continue
-
-            arguments.append(dict(
-                blender_executable = blender_executable,
-                blend_path = blend_path,
-                intermediate_root = intermediate_root,
-                rig_name = rig_name,
-                animation_name = animation_name,
-                result_root = result_root,
-            ))
+        animation_name = os.path.basename(anim_folder)
+
+        arguments.append(dict(
+            blender_executable = blender_executable,
+            blend_path = blend_path,
+            intermediate_root = intermediate_root,
+            rig_name = rig_name,
+            animation_name = animation_name,
+            result_root = result_root,
+        ))
 
 
     return arguments
@@ -2,6 +2,7 @@ import os
 import sys
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -67,7 +68,7 @@ def get_program(
 
     program.run(python, scripts_panda3d.run_gltf2bam, gltf_path, bam_path, settings)
 
-    return program
+    return result_cache.use(program)
 
 
 def get_arguments(
@@ -2,6 +2,7 @@ import os
 import sys
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -73,7 +74,7 @@ def get_program(
     program.run(python, scripts_panda3d.convert_collision_placeholders, bam_path)
     program.run(python, scripts_panda3d.convert_curve_placeholders, bam_path)
 
-    return program
+    return result_cache.use(program)
 
 
 def get_arguments(
@@ -2,6 +2,7 @@ import os
 
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import export as scripts_export
 from ..scripts import bake as scripts_bake
@@ -44,7 +45,7 @@ def get_program(
 
     program.run(blender, scripts_export.save_blend_with_repack, result_path)
 
-    return program
+    return result_cache.use(program)
 
 
 def get_arguments(
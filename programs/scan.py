@@ -1,6 +1,7 @@
 import os
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import scan as scripts_scan
 
@@ -40,7 +41,7 @@ def get_program(blender_executable: str, blend_path, result_dir):
 
     program.run(blender, bpy_data.save_as_mainfile, result_path)
 
-    return program
+    return result_cache.use(program, extra_outputs = [result_dir])
 
 
 def get_arguments(
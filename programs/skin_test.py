@@ -1,6 +1,7 @@
 import os
 
 from .. import configuration
+from .. import result_cache
 
 from ..scripts import bake as scripts_bake
 from ..programs.bake import get_program as get_bake_program
@@ -8,7 +9,7 @@ from ..programs.bake import get_program as get_bake_program
 
 def get_program(*args, create_game_rig = False, **kwargs):
 
-    program = get_bake_program(*args, **kwargs)
+    program = get_bake_program(*args, use_result_cache = False, **kwargs)
 
     blender = program.instructions[-1].executor
 
@@ -18,7 +19,7 @@ def get_program(*args, create_game_rig = False, **kwargs):
     program.run(blender, scripts_bake.limit_bendy_bones, **kwargs)
     program.run(blender, scripts_bake.create_game_rig_and_bake_actions, scripts_bake.S_Deform_Armature(), False, **kwargs)
 
-    return program
+    return result_cache.use(program)
 
 
 def get_arguments(
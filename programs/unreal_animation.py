@@ -1,6 +1,7 @@
 import os
 
 from .. import configuration
+from .. import unreal_executor
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -21,7 +22,6 @@ def get_program(
         ):
     """ export as an animation only fbx file """
 
-    from blend_converter.unreal.executor import Unreal
     from blend_converter.blender.executor import Blender
     from blend_converter.blender import bpy_data
     from blend_converter.blender import bpy_export
@@ -37,7 +37,7 @@ def get_program(
     if remote_execution_settings:
         remote_execution_settings = S_Execution_Handler._from_dict(remote_execution_settings)
 
-    unreal = Unreal(remote_execution_settings)
+    unreal = unreal_executor.Exclusive_Unreal(remote_execution_settings)
     blender = Blender(blender_executable)
 
     program = common.Program(
@@ -86,13 +86,9 @@ def get_program(
     )
 
 
-    init_interchange = program.run(unreal, scripts_unreal.get_console_variable_bool_value, scripts_unreal.INTERCHANGE_FLAG)
-    program.run(unreal, scripts_unreal.set_console_variable_bool_value, scripts_unreal.INTERCHANGE_FLAG, False)
-
+    program.run(unreal, scripts_unreal.begin_import_session)
     program.run(unreal, scripts_unreal.import_anim_sequence, ue_fbx_settings)
 
-    program.run(unreal, scripts_unreal.set_console_variable_bool_value, scripts_unreal.INTERCHANGE_FLAG, init_interchange)
-
 
     return program
 
@@ -109,28 +105,21 @@ def get_arguments(
 
     arguments = []
 
-    for rig_folder in configuration.get_folders(source_root):
+    for rig_folder, anim_folder, blend_path in configuration.get_nested_blends(source_root):
 
         rig_name = os.path.basename(rig_folder)
-
-        for anim_folder in configuration.get_folders(rig_folder):
-
-            animation_name = os.path.basename(anim_folder)
-
-            blend_path = configuration.get_blend(anim_folder)
-            if not blend_path:
-                continue
-
-            arguments.append(dict(
-                blender_executable = blender_executable,
-                blend_path = blend_path,
-                rig_name = rig_name,
-                animation_name = animation_name,
-                fbx_root = fbx_root,
-                root_destination_folder = root_destination_folder,
-                skeletal_root_destination_folder = skeletal_root_destination_folder,
-                remote_execution_settings = remote_execution_settings,
-            ))
+        animation_name = os.path.basename(anim_folder)
+
+        arguments.append(dict(
+            blender_executable = blender_executable,
+            blend_path = blend_path,
+            rig_name = rig_name,
+            animation_name = animation_name,
+            fbx_root = fbx_root,
+            root_destination_folder = root_destination_folder,
+            skeletal_root_destination_folder = skeletal_root_destination_folder,
+            remote_execution_settings = remote_execution_settings,
+        ))
 
 
     return arguments
@@ -1,6 +1,8 @@
 import os
+import sys
 
 from .. import configuration
+from .. import unreal_executor
 
 from ..scripts import bake as scripts_bake
 from ..scripts import export as scripts_export
@@ -17,11 +19,20 @@ def get_program(
             fbx_root: str,
             root_destination_folder: str,
             remote_execution_settings: S_Execution_Handler = None,
+            import_batch_size: int = 1,
+            import_idle_delay: float = 10.0,
         ):
-    """ export as a fbx static mesh """
+    """
+    export as a fbx static mesh
+
+    `import_batch_size`: queue the import in the editor session and import the queue in batches of that many assets, see `scripts_unreal.queue_import`.
+    The program waits for its own import and fails if it has failed.
+
+    `import_idle_delay`: a partial batch is imported once the editor has ticked that many seconds without a new import, see `scripts_unreal.get_import_timeout` for the wait.
+    """
 
-    from blend_converter.unreal.executor import Unreal
     from blend_converter.blender.executor import Blender
+    from blend_converter.python.executor import Python
     from blend_converter.blender import bpy_utils
     from blend_converter.blender import bpy_data
     from blend_converter.blender import bpy_export
@@ -38,7 +49,7 @@ def get_program(
     if remote_execution_settings:
         remote_execution_settings = S_Execution_Handler._from_dict(remote_execution_settings)
 
-    unreal = Unreal(remote_execution_settings)
+    unreal = unreal_executor.Exclusive_Unreal(remote_execution_settings)
     blender = Blender(blender_executable)
 
     program = common.Program(
@@ -48,7 +59,11 @@ def get_program(
         settings_path = os.path.join(blend_path.dir, 'bc_instructions.ini'),
     )
 
-    program.tags.add('unreal')
+    # the queued imports wait for each other, only the editor execution is exclusive
+    if import_batch_size > 1:
+        program.tags.add('unreal_queue')
+    else:
+        program.tags.add('unreal')
 
     program.label = 'UNREAL STATIC 👾'
 
@@ -88,12 +103,12 @@ def get_program(
     )
 
 
-    init_interchange = program.run(unreal, scripts_unreal.get_console_variable_bool_value, scripts_unreal.INTERCHANGE_FLAG)
-    program.run(unreal, scripts_unreal.set_console_variable_bool_value, scripts_unreal.INTERCHANGE_FLAG, False)
-
-    program.run(unreal, scripts_unreal.import_static_mesh, fbx_settings)
-
-    program.run(unreal, scripts_unreal.set_console_variable_bool_value, scripts_unreal.INTERCHANGE_FLAG, init_interchange)
+    if import_batch_size > 1:
+        program.run(unreal, scripts_unreal.queue_import, scripts_unreal.Import_Kind.STATIC_MESH, fbx_settings, import_batch_size, import_idle_delay)
+        program.run(Python(sys.executable), scripts_unreal.wait_for_import, fbx_path, scripts_unreal.get_import_timeout(import_idle_delay))
+    else:
+        program.run(unreal, scripts_unreal.begin_import_session)
+        program.run(unreal, scripts_unreal.import_static_mesh, fbx_settings)
 
 
     return program
@@ -105,6 +120,8 @@ def get_arguments(
             fbx_root: str,
             root_destination_folder: str = configuration.Folder.UNREAL_STATIC,
             remote_execution_settings: S_Execution_Handler = None,
+            import_batch_size: int = 1,
+            import_idle_delay: float = 10.0,
         ):
 
 
@@ -122,6 +139,8 @@ def get_arguments(
             fbx_root = fbx_root,
             root_destination_folder = root_destination_folder,
             remote_execution_settings = remote_execution_settings,
+            import_batch_size = import_batch_size,
+            import_idle_delay = import_idle_delay,
         ))
 
 
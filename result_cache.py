@@ -0,0 +1,284 @@
+"""
+A content-addressed cache of the program results.
+
+The key is a hash of the source asset folder content, the instructions and their settings and the Blender executable.
+If a program is stale but its key is in the cache, the outputs are restored and the report is written without launching Blender.
+"""
+
+import os
+import sys
+import json
+import shutil
+import typing
+import hashlib
+import uuid
+
+
+ROOT = os.path.dirname(os.path.realpath(__file__))
+
+CACHE_DIR = os.path.join(ROOT, 'result_cache')
+
+RESULTS_DIR = os.path.join(CACHE_DIR, 'results')
+
+FILE_HASHES_DIR = os.path.join(CACHE_DIR, 'file_hashes')
+
+MANIFEST_NAME = 'manifest.json'
+
+REPORT_EXT = '.bc_report'
+
+
+if typing.TYPE_CHECKING:
+    from blend_converter import common
+
+
+class Cache_Status:
+    HIT = 'hit'
+    """ Restored from the cache. """
+    MISS = 'miss'
+    """ Will be executed and stored. """
+    CURRENT = 'current'
+    """ Already up to date. """
+
+
+def get_file_sha256(path: str):
+
+    hash = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hash.update(chunk)
+
+    return hash.hexdigest()
+
+
+def get_folder_hash(folder: str, extensions: typing.Optional[typing.Tuple[str, ...]] = None):
+    """
+    Hash the content of all the files in the folder, reusing the previous file hashes if the size and mtime did not change.
+
+    `extensions`: hash only the files with these extensions, e.g. `('.py',)`.
+    """
+
+    folder = os.path.realpath(folder)
+
+    hashes_path = os.path.join(FILE_HASHES_DIR, hashlib.sha1(repr((os.path.normcase(folder), extensions)).encode('utf-8')).hexdigest() + '.json')
+
+    try:
+        with open(hashes_path, encoding = 'utf-8') as f:
+            prev_hashes: typing.Dict[str, list] = json.load(f)
+    except (OSError, ValueError):
+        prev_hashes = {}
+
+    hashes: typing.Dict[str, list] = {}
+
+    for root, dirs, files in os.walk(folder):
+
+        dirs.sort()
+
+        for name in sorted(files):
+
+            if name.endswith(REPORT_EXT):
+                continue
+
+            if extensions is not None and not name.endswith(extensions):
+                continue
+
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, folder).replace(os.sep, '/')
+
+            stat = os.stat(path)
+
+            prev = prev_hashes.get(relpath)
+            if prev and prev[0] == stat.st_size and prev[1] == stat.st_mtime_ns:
+                hashes[relpath] = prev
+            else:
+                hashes[relpath] = [stat.st_size, stat.st_mtime_ns, get_file_sha256(path)]
+
+    if hashes != prev_hashes:
+        os.makedirs(FILE_HASHES_DIR, exist_ok = True)
+        temp_path = f"{hashes_path}.{uuid.uuid1().hex}"
+        with open(temp_path, 'w', encoding = 'utf-8') as f:
+            json.dump(hashes, f)
+        os.replace(temp_path, hashes_path)
+
+    hash = hashlib.sha256()
+
+    for relpath, (_, _, sha256) in hashes.items():
+        hash.update(relpath.encode('utf-8'))
+        hash.update(sha256.encode('utf-8'))
+
+    return hash.hexdigest()
+
+
+def get_executable_identity(path: str):
+    """ A Blender version gets a different binary, so the path, size and mtime are enough. """
+
+    path = os.path.realpath(path)
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path]
+
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def get_code_paths(program: 'common.Program'):
+    """ The packages of the instruction functions, a change in a script can change the result even if the instructions are the same. """
+
+    from blend_converter import serialization
+
+    paths = []
+
+    for instruction in program.instructions:
+
+        path = serialization.get_top_package_file(instruction.func)
+
+        if os.path.basename(path) == '__init__.py':
+            path = os.path.dirname(path)
+
+        paths.append(path)
+
+    return list(dict.fromkeys(paths))
+
+
+def get_key(program: 'common.Program', inputs: typing.Iterable[str] = ()):
+    """
+    The asset folder usually holds the blend, its textures, its linked libraries and `bc_instructions.ini`.
+
+    `inputs` are additional files or folders, e.g. libraries linked from outside of the asset folder.
+    """
+
+    hash = hashlib.sha256()
+
+    def update(value):
+        hash.update(json.dumps(value, sort_keys = True, default = lambda x: x._to_dict()).encode('utf-8'))
+
+    update(program.get_next_report_diff())
+    update(get_executable_identity(program.blender_executable))
+
+    for path in get_code_paths(program):
+        if os.path.isdir(path):
+            update(get_folder_hash(path, extensions = ('.py',)))
+        else:
+            update(get_file_sha256(path))
+
+    for path in [os.path.dirname(program.blend_path), *inputs]:
+        if os.path.isdir(path):
+            update(get_folder_hash(path))
+        elif os.path.isfile(path):
+            update(get_file_sha256(path))
+        else:
+            update(None)
+
+    return hash.hexdigest()
+
+
+def get_entry_dir(key: str):
+    return os.path.join(RESULTS_DIR, key[:2], key)
+
+
+def get_outputs(result_path: str, extra_outputs: typing.Iterable[str] = ()):
+    """ The result file, its siblings with the same name and extra files or folders, e.g. `x.gltf`, `x.bin`, `x.fbx.blend`. """
+
+    outputs = [os.path.realpath(path) for path in extra_outputs]
+
+    folder = os.path.dirname(os.path.realpath(result_path))
+    name = os.path.basename(result_path)
+    stem = os.path.splitext(name)[0]
+
+    if os.path.isdir(folder):
+        for file in os.scandir(folder):
+
+            if not file.is_file() or file.name.endswith(REPORT_EXT):
+                continue
+
+            if file.name == name or file.name.startswith(stem + '.'):
+                outputs.append(file.path)
+
+    return list(dict.fromkeys(outputs))
+
+
+def store(key: str, result_path: str, extra_outputs: typing.List[str]):
+    """ Executed after all the other instructions have succeeded. """
+
+    entry_dir = get_entry_dir(key)
+    if os.path.exists(entry_dir):
+        return
+
+    temp_dir = entry_dir + '.' + uuid.uuid1().hex
+    os.makedirs(temp_dir)
+
+    manifest = []
+
+    for index, path in enumerate(get_outputs(result_path, extra_outputs)):
+
+        stored_name = f"{index}_{os.path.basename(path)}"
+
+        if os.path.isdir(path):
+            shutil.copytree(path, os.path.join(temp_dir, stored_name), ignore = shutil.ignore_patterns('*' + REPORT_EXT))
+        elif os.path.isfile(path):
+            shutil.copy2(path, os.path.join(temp_dir, stored_name))
+        else:
+            continue
+
+        manifest.append(dict(path = path, stored_name = stored_name))
+
+    with open(os.path.join(temp_dir, MANIFEST_NAME), 'w', encoding = 'utf-8') as f:
+        json.dump(manifest, f, indent = 4, ensure_ascii = False)
+
+    try:
+        os.replace(temp_dir, entry_dir)
+    except OSError:
+        # stored concurrently by another process
+        shutil.rmtree(temp_dir, ignore_errors = True)
+
+
+def restore(key: str):
+    """ Returns `False` if the key is not in the cache. """
+
+    entry_dir = get_entry_dir(key)
+
+    try:
+        with open(os.path.join(entry_dir, MANIFEST_NAME), encoding = 'utf-8') as f:
+            manifest: typing.List[dict] = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    for item in manifest:
+
+        stored_path = os.path.join(entry_dir, item['stored_name'])
+
+        if os.path.isdir(stored_path):
+            shutil.copytree(stored_path, item['path'], dirs_exist_ok = True)
+        else:
+            os.makedirs(os.path.dirname(item['path']), exist_ok = True)
+            shutil.copy2(stored_path, item['path'])
+
+    return True
+
+
+def use(program: 'common.Program', extra_outputs: typing.Iterable[str] = (), inputs: typing.Iterable[str] = (), key: typing.Optional[str] = None):
+    """
+    Make the program use the result cache. Must be called after all the other instructions have been added.
+
+    `key`: computed beforehand with `get_key` when the instructions have been replaced since, e.g. by resuming from a checkpoint.
+
+    The cache status is stored as `program.cache_status`.
+    """
+
+    from blend_converter.python.executor import Python
+
+    if key is None:
+        key = get_key(program, inputs)
+
+    program.run(Python(sys.executable), store, key, program.result_path, list(extra_outputs))
+
+    if not program.are_instructions_changed:
+        program.cache_status = Cache_Status.CURRENT
+    elif restore(key):
+        program.write_report({'comment': f"Restored from the result cache: {key}"})
+        program.cache_status = Cache_Status.HIT
+    else:
+        program.cache_status = Cache_Status.MISS
+
+    return program
@@ -0,0 +1,246 @@
+""" Admitting programs based on the live free memory and CPU load. """
+
+import os
+import json
+import time
+import typing
+import threading
+
+import psutil
+
+from blend_converter import updater as bc_updater
+
+
+ROOT = os.path.dirname(os.path.realpath(__file__))
+
+RESOURCE_USAGE_PATH = os.path.join(ROOT, 'resource_usage.json')
+
+GIB = 1024 ** 3
+
+DEFAULT_MEMORY_ESTIMATE = 1 * GIB
+
+DEFAULT_MEMORY_ESTIMATES = {
+    'bake': 8 * GIB,
+}
+""" Used until a program with the tag has been measured. """
+
+RECORDS_PER_TAG = 10
+""" The number of the latest peak memory measurements kept per tag. """
+
+MEMORY_ESTIMATE_MARGIN = 1.2
+
+MEMORY_RESERVE = 2 * GIB
+""" The memory left for the system and the GUI. """
+
+CPU_HEAVY_TAGS = {'bake'}
+""" Limited by the idle CPU cores, the other programs are limited only by the memory. """
+
+
+def is_cpu_heavy(tags: typing.Iterable[str]):
+    return not CPU_HEAVY_TAGS.isdisjoint(tags)
+
+
+def get_process_tree_memory(process: psutil.Process):
+    """ The resident memory of the process and all its children, e.g. the update process and the Blender it launched. """
+
+    memory = 0
+
+    try:
+        processes = [process] + process.children(recursive = True)
+    except psutil.Error:
+        return 0
+
+    for process in processes:
+        try:
+            memory += process.memory_info().rss
+        except psutil.Error:
+            pass
+
+    return memory
+
+
+class Resource_Policy:
+    """
+    Admits a program only if its estimated memory fits into the memory left by the already running programs, and periodically limits the CPU heavy programs by the idle CPU cores.
+
+    The memory is checked on each despatch of the updater against a single budget shared by all the tags.
+    The running programs that have not yet reached their estimate are counted with the rest of it, so a burst of the despatched programs does not overshoot.
+
+    The peak memory of each finished program is recorded per tag and used as the estimate in the next runs.
+    A CPU bound bake does not block the light exports, they still run next to it while the memory allows.
+    The per tag limits set on the updater, e.g. `unreal` is always 1, still apply.
+    """
+
+
+    def __init__(self, updater: bc_updater.Updater, usage_path = RESOURCE_USAGE_PATH):
+
+        self.updater = updater
+
+        self.max_parallel = psutil.cpu_count(logical = False) or 1
+
+        self.max_cpu_heavy_executions = self.max_parallel
+        """ Set by `apply` from the CPU load. """
+
+        # the first call has nothing to compare with and returns 0.0
+        psutil.cpu_percent()
+
+        self.usage_path = usage_path
+        self.records: typing.Dict[str, typing.List[int]] = {}
+
+        self.peaks: typing.Dict[str, typing.Tuple[bc_updater.Program_Entry, int]] = {}
+        """ The peak memory of the currently running entries by `entry_id`. """
+
+        self.lock = threading.Lock()
+        """ The updater despatches from its own thread. """
+
+        self.is_running = False
+
+        self.load()
+
+        self.updater_max_executions_per_tag_exceeded = updater.max_executions_per_tag_exceeded
+        updater.max_executions_per_tag_exceeded = self.max_executions_per_tag_exceeded
+
+
+    def load(self):
+
+        try:
+            with open(self.usage_path, encoding = 'utf-8') as f:
+                self.records.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+
+    def save(self):
+
+        try:
+            with open(self.usage_path, 'w', encoding = 'utf-8') as f:
+                json.dump(self.records, f, indent = 4)
+        except OSError as e:
+            print(f"Cannot save the resource usage: {e}")
+
+
+    def get_memory_estimate(self, tags: typing.Iterable[str]):
+
+        estimates = []
+
+        for tag in tags:
+            records = self.records.get(tag)
+            if records:
+                estimates.append(max(records) * MEMORY_ESTIMATE_MARGIN)
+            else:
+                estimates.append(DEFAULT_MEMORY_ESTIMATES.get(tag, DEFAULT_MEMORY_ESTIMATE))
+
+        return max(estimates, default = DEFAULT_MEMORY_ESTIMATE)
+
+
+    def sample(self):
+        """ Track the peak memory of the running entries and record the ones that have finished. """
+
+        active_entries = {entry.entry_id: entry for entry in self.updater.entries if entry.status in bc_updater.ACTIVE_ENTRIES}
+
+        for entry_id, entry in active_entries.items():
+
+            if entry.psutil_process is None:
+                continue
+
+            memory = get_process_tree_memory(entry.psutil_process)
+
+            with self.lock:
+                _, peak = self.peaks.get(entry_id, (entry, 0))
+                self.peaks[entry_id] = (entry, max(peak, memory))
+
+        is_changed = False
+
+        for entry_id in list(self.peaks):
+
+            if entry_id in active_entries:
+                continue
+
+            with self.lock:
+                entry, peak = self.peaks.pop(entry_id)
+
+            if entry.status != bc_updater.Status.OK or not peak:
+                continue
+
+            for tag in entry.program.tags:
+                records = self.records.setdefault(tag, [])
+                records.append(peak)
+                del records[:-RECORDS_PER_TAG]
+
+            is_changed = True
+
+        if is_changed:
+            self.save()
+
+        return list(active_entries.values())
+
+
+    def get_available_memory(self, active_entries: typing.List[bc_updater.Program_Entry]):
+        """ The memory left after the running programs have reached their estimates. """
+
+        available_memory = psutil.virtual_memory().available - MEMORY_RESERVE
+
+        with self.lock:
+            peaks = {entry_id: peak for entry_id, (_, peak) in self.peaks.items()}
+
+        # the memory of the just launched programs is not yet allocated
+        for entry in active_entries:
+            available_memory -= max(self.get_memory_estimate(entry.program.tags) - peaks.get(entry.entry_id, 0), 0)
+
+        return available_memory
+
+
+    def max_executions_per_tag_exceeded(self, tags: typing.Iterable[str]):
+        """ Replaces the check of the updater, called for each program on each despatch. """
+
+        tags = list(tags)
+
+        if self.updater_max_executions_per_tag_exceeded(tags):
+            return True
+
+        active_entries = [entry for entry in self.updater.entries if entry.status in bc_updater.ACTIVE_ENTRIES]
+        if not active_entries:
+            return False
+
+        if is_cpu_heavy(tags):
+            if sum(is_cpu_heavy(entry.program.tags) for entry in active_entries) >= self.max_cpu_heavy_executions:
+                return True
+
+        return self.get_memory_estimate(tags) > self.get_available_memory(active_entries)
+
+
+    def apply(self):
+
+        active_entries = self.sample()
+
+        idle_cores = self.max_parallel * (1 - psutil.cpu_percent() / 100)
+
+        cpu_heavy_count = sum(is_cpu_heavy(entry.program.tags) for entry in active_entries)
+
+        # the first CPU heavy program is admitted even on a busy CPU
+        self.max_cpu_heavy_executions = min(max(cpu_heavy_count + max(int(idle_cores), 0), 1), self.max_parallel)
+
+        # the finished programs could have freed the memory
+        self.updater.despatch()
+
+
+    def run(self, interval: float):
+
+        while self.is_running:
+
+            try:
+                self.apply()
+            except Exception as e:
+                print(f"Resource policy error: {e}")
+
+            time.sleep(interval)
+
+
+    def start(self, interval = 2.0):
+
+        self.is_running = True
+        threading.Thread(target = self.run, args = (interval,), daemon = True).start()
+
+
+    def stop(self):
+        self.is_running = False
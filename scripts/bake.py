@@ -4,6 +4,8 @@ import os
 import sys
 import typing
 import uuid
+import json
+import functools
 
 
 from .. import configuration
@@ -105,36 +107,176 @@ class S_Target_Objects(settings_base.Settings):
     """
 
 
-def get_bone_custom_shapes():
+class Scene_Index:
+    """ The armature, bone custom shape and mesh deformer relations collected in a single pass over `bpy.data.objects`. """
 
-    shapes: typing.Set[bpy.types.Object] = set()
 
-    for o in bpy.data.objects:
+    def __init__(self):
 
-        if o.type != 'ARMATURE':
-            continue
+        self.custom_shapes: typing.Set[bpy.types.Object] = set()
+        self.mesh_deformers: typing.Set[bpy.types.Object] = set()
+        self.armature_to_objects: typing.Dict[bpy.types.Object, typing.List[bpy.types.Object]] = {}
+
+        for o in bpy.data.objects:
+            self.add_object(o)
 
-        for bone in o.pose.bones:
-            if bone.custom_shape:
-                shapes.add(bone.custom_shape)
 
-    return shapes
+    def add_object(self, o: 'bpy.types.Object'):
 
+        if o.type == 'ARMATURE':
+            for bone in o.pose.bones:
+                if bone.custom_shape:
+                    self.custom_shapes.add(bone.custom_shape)
 
-def get_mesh_deformers():
+        armatures: typing.Dict[bpy.types.Object, None] = {}
 
-    result: typing.Set[bpy.types.Object] = set()
+        if o.type == 'MESH' and o.parent:
+            armatures[o.parent] = None
 
-    for o in bpy.data.objects:
         for modifier in o.modifiers:
+
             if modifier.type == 'MESH_DEFORM' and modifier.object:
-                result.add(modifier.object)
+                self.mesh_deformers.add(modifier.object)
 
-    return result
+            elif o.type == 'MESH' and modifier.type == 'ARMATURE' and modifier.object:
+                armatures[modifier.object] = None
+
+        for armature in armatures:
+            self.armature_to_objects.setdefault(armature, []).append(o)
+
+
+    def update_objects(self, objects: typing.Iterable['bpy.types.Object']):
+        """ Index the armatures of the objects again after they have been re-parented or their armature modifiers have been changed. """
+
+        objects = set(objects)
+
+        for armature_objects in self.armature_to_objects.values():
+            armature_objects[:] = [o for o in armature_objects if o not in objects]
+
+        for o in objects:
+            self.add_object(o)
+
+
+    def remove_armature(self, armature: 'bpy.types.Object'):
+        """ Call before deleting the armature. The custom shapes of its bones are kept. """
+        self.armature_to_objects.pop(armature, None)
+
+
+    def get_objects_for_armature(self, armature: 'bpy.types.Object'):
+        return list(self.armature_to_objects.get(armature, ()))
+
+
+def get_bone_custom_shapes(index: typing.Optional[Scene_Index] = None):
+
+    if index is None:
+        index = Scene_Index()
+
+    return set(index.custom_shapes)
+
+
+def get_mesh_deformers(index: typing.Optional[Scene_Index] = None):
+
+    if index is None:
+        index = Scene_Index()
+
+    return set(index.mesh_deformers)
+
+
+TOPOLOGY_PRESERVING_MODIFIERS = {
+    'ARMATURE',
+    'CAST',
+    'CORRECTIVE_SMOOTH',
+    'CURVE',
+    'DATA_TRANSFER',
+    'DISPLACE',
+    'HOOK',
+    'LAPLACIANDEFORM',
+    'LAPLACIANSMOOTH',
+    'LATTICE',
+    'MESH_DEFORM',
+    'NORMAL_EDIT',
+    'SHRINKWRAP',
+    'SIMPLE_DEFORM',
+    'SMOOTH',
+    'SURFACE_DEFORM',
+    'UV_PROJECT',
+    'UV_WARP',
+    'VERTEX_WEIGHT_EDIT',
+    'VERTEX_WEIGHT_MIX',
+    'VERTEX_WEIGHT_PROXIMITY',
+    'WARP',
+    'WAVE',
+    'WEIGHTED_NORMAL',
+}
+""" Modifiers that only change the vertex positions or the attributes. """
+
+FACE_PRESERVING_MODIFIERS = {
+    'BEVEL',
+    'EDGE_SPLIT',
+    'MULTIRES',
+    'SOLIDIFY',
+    'SUBSURF',
+    'TRIANGULATE',
+    'WIREFRAME',
+}
+""" Modifiers that never remove all the faces, but `SOLIDIFY` and `WIREFRAME` can create faces from loose edges. """
+
+NO_FACE_PRESERVING_MODIFIERS = {
+    'EDGE_SPLIT',
+    'MULTIRES',
+    'SUBSURF',
+    'TRIANGULATE',
+}
+""" Modifiers that never create faces from loose edges or vertices. """
+
+
+def will_have_polygons_fast(object: 'bpy.types.Object') -> typing.Optional[bool]:
+    """ Answer from the base data and the modifier stack classification, `None` if undecidable without evaluating. """
+
+    modifier_types = {modifier.type for modifier in object.modifiers if modifier.show_viewport}
+
+    if object.type == 'MESH':
+
+        has_polygons = bool(object.data.polygons)
+
+        if modifier_types.issubset(TOPOLOGY_PRESERVING_MODIFIERS):
+            return has_polygons
+
+        if has_polygons and modifier_types.issubset(TOPOLOGY_PRESERVING_MODIFIERS | FACE_PRESERVING_MODIFIERS):
+            return True
+
+        if not has_polygons and modifier_types.issubset(TOPOLOGY_PRESERVING_MODIFIERS | NO_FACE_PRESERVING_MODIFIERS):
+            return False
+
+    elif object.type == 'CURVE':
+
+        if modifier_types:
+            return None
+
+        data: bpy.types.Curve = object.data
+
+        if not data.splines:
+            return False
+
+        is_filled = data.dimensions == '2D' and data.fill_mode != 'NONE'
+
+        if not is_filled and not data.bevel_depth and not data.extrude and data.bevel_mode != 'PROFILE' and not data.bevel_object:
+            return False
+
+    elif object.type == 'FONT':
+
+        if not modifier_types and not object.data.body.strip():
+            return False
+
+    return None
 
 
 def will_have_polygons(object: 'bpy.types.Object', depsgraph: 'bpy.types.Depsgraph'):
 
+    has_polygons = will_have_polygons_fast(object)
+    if has_polygons is not None:
+        return has_polygons
+
     evaluated = object.evaluated_get(depsgraph)
     has_polygons = bool(evaluated.to_mesh().polygons)
     evaluated.to_mesh_clear()
@@ -142,6 +284,121 @@ def will_have_polygons(object: 'bpy.types.Object', depsgraph: 'bpy.types.Depsgra
     return has_polygons
 
 
+_will_have_polygons_cache: typing.Dict[int, typing.Tuple[tuple, bool]] = {}
+""" `object.as_pointer()` to the geometry fingerprint and the result, valid within a blend file session. """
+
+
+def _clear_will_have_polygons_cache(*args):
+    _will_have_polygons_cache.clear()
+
+
+if 'bpy' in sys.modules:
+    # stays registered when a file is loaded, which is when it is needed
+    bpy.app.handlers.persistent(_clear_will_have_polygons_cache)
+
+
+UNCACHEABLE_MODIFIERS = {
+    'BOOLEAN',
+    'MASK',
+    'NODES',
+}
+""" The result depends on the other objects, the vertex weights or the node group inputs, which are not a part of the fingerprint. """
+
+
+def get_modifier_fingerprint(modifier: 'bpy.types.Modifier'):
+    """ The values of the modifier settings, `None` if the modifier references a data block. """
+
+    if modifier.type in UNCACHEABLE_MODIFIERS:
+        return None
+
+    values = [modifier.name, modifier.type]
+
+    for property in modifier.bl_rna.properties:
+
+        if property.identifier == 'rna_type' or property.type == 'COLLECTION':
+            continue
+
+        value = getattr(modifier, property.identifier)
+
+        if property.type == 'POINTER':
+            if isinstance(value, bpy.types.ID):
+                return None
+            continue
+
+        if getattr(property, 'array_length', 0):
+            value = tuple(value)
+
+        values.append(value)
+
+    return tuple(values)
+
+
+def get_geometry_fingerprint(object: 'bpy.types.Object'):
+    """
+    A cheap summary of what the evaluated geometry depends on, `None` if it depends on the other objects.
+
+    The pipeline steps between the target objects queries convert, apply and delete, which change the data, the modifier stack or the element counts.
+    """
+
+    data = object.data
+
+    fingerprint = [
+        object.name,
+        object.type,
+        data.as_pointer() if data else None,
+        object.instance_type,
+        object.instance_collection.as_pointer() if object.instance_collection else None,
+        bpy.context.scene.frame_current,
+    ]
+
+    if object.type == 'MESH':
+        fingerprint.extend((len(data.vertices), len(data.polygons), data.shape_keys.as_pointer() if data.shape_keys else None))
+    elif object.type in ('CURVE', 'FONT'):
+        fingerprint.extend((len(data.splines), data.bevel_depth, data.extrude, data.bevel_object.as_pointer() if data.bevel_object else None))
+
+    for modifier in object.modifiers:
+
+        modifier_fingerprint = get_modifier_fingerprint(modifier)
+        if modifier_fingerprint is None:
+            return None
+
+        fingerprint.append(modifier_fingerprint)
+
+    return tuple(fingerprint)
+
+
+def will_have_polygons_cached(object: 'bpy.types.Object', get_depsgraph: typing.Callable[[], 'bpy.types.Depsgraph']):
+    """
+    Only evaluate the object again if its geometry fingerprint has changed since the previous call.
+    The objects with the modifiers that depend on the other data are evaluated each time, see `UNCACHEABLE_MODIFIERS`.
+
+    `get_depsgraph` is only called on a cache miss, as getting the evaluated depsgraph can update the whole scene.
+    """
+
+    if _clear_will_have_polygons_cache not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_clear_will_have_polygons_cache)
+
+    has_polygons = will_have_polygons_fast(object)
+    if has_polygons is not None:
+        return has_polygons
+
+    key = object.as_pointer()
+    fingerprint = get_geometry_fingerprint(object)
+
+    if fingerprint is None:
+        return will_have_polygons(object, get_depsgraph())
+
+    cached = _will_have_polygons_cache.get(key)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+
+    has_polygons = will_have_polygons(object, get_depsgraph())
+
+    _will_have_polygons_cache[key] = (fingerprint, has_polygons)
+
+    return has_polygons
+
+
 def get_target_objects(settings: S_Target_Objects = None):
 
     settings = S_Target_Objects()._update(settings)
@@ -152,10 +409,14 @@ def get_target_objects(settings: S_Target_Objects = None):
     result: typing.List[bpy.types.Object] = []
 
 
-    custom_shapes = get_bone_custom_shapes()
-    mesh_deformers = get_mesh_deformers()
+    index = Scene_Index()
+    custom_shapes = get_bone_custom_shapes(index)
+    mesh_deformers = get_mesh_deformers(index)
     SENTINEL = object()
-    depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    @functools.lru_cache(None)
+    def get_depsgraph():
+        return bpy.context.evaluated_depsgraph_get()
 
     meshable_objects = set(bpy_utils.get_meshable_objects(all_objects))
 
@@ -204,7 +465,7 @@ def get_target_objects(settings: S_Target_Objects = None):
 
             if o in meshable_objects:
 
-                if not will_have_polygons(o, depsgraph):
+                if not will_have_polygons_cached(o, get_depsgraph):
                     continue
 
 
@@ -271,15 +532,16 @@ def convert_empty_to_mesh(empty: 'bpy.types.Object'):
 
     object.matrix_world = empty.evaluated_get(depsgraph).matrix_world
 
-    # reparent to
-    for other_object in bpy.data.objects:
+    # reparent to, the same as `bpy.ops.object.parent_set(type='OBJECT', keep_transform=True)` for all the children at once
+    children = [(child, child.evaluated_get(depsgraph).matrix_world.copy()) for child in empty.children]
 
-        if other_object.parent != empty:
-            continue
+    parent_inverse = object.matrix_world.inverted_safe()
 
-        with bpy_context.Focus([object, other_object]):
-            bpy.context.view_layer.objects.active = object
-            bpy.ops.object.parent_set(type='OBJECT', keep_transform=True)
+    for child, matrix_world in children:
+        child.parent = object
+        child.parent_type = 'OBJECT'
+        child.matrix_parent_inverse = parent_inverse
+        child.matrix_basis = matrix_world
 
     bpy.data.objects.remove(empty)
 
@@ -445,10 +707,54 @@ def get_armature_modifier(object: 'bpy.types.Object'):
             return modifier.name
 
 
+def _apply_modifiers_evaluated(object_to_names: typing.Dict['bpy.types.Object', typing.List[str]]):
+    """
+    Applying the modifiers one by one is the same as evaluating the stack with only these modifiers enabled,
+    so all the objects are evaluated once instead of once per modifier.
+    """
+
+    disabled: typing.List[typing.Tuple[bpy.types.Object, str]] = []
+
+    try:
+
+        for object, names in object_to_names.items():
+            for modifier in object.modifiers:
+                if modifier.show_viewport and modifier.name not in names:
+                    modifier.show_viewport = False
+                    disabled.append((object, modifier.name))
+
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+        for object, names in object_to_names.items():
+
+            print(f"Applying modifiers: {repr(object.name_full)} {names}")
+
+            mesh = bpy.data.meshes.new_from_object(object.evaluated_get(depsgraph), preserve_all_data_layers = True, depsgraph = depsgraph)
+
+            prev_mesh = object.data
+            object.data = mesh
+
+            # the other users of the shared mesh data keep it
+            if not prev_mesh.users:
+                name = prev_mesh.name
+                bpy.data.meshes.remove(prev_mesh)
+                mesh.name = name
+
+            for name in names:
+                object.modifiers.remove(object.modifiers[name])
+
+    finally:
+
+        for object, name in disabled:
+            object.modifiers[name].show_viewport = True
+
+
 def _apply_modifiers(filter_func: typing.Callable, objects: typing.List['bpy.types.Object'], preserve_armature: bool):
 
     with bpy_context.Focus(objects):
 
+        object_to_names: typing.Dict[bpy.types.Object, typing.List[str]] = {}
+
         for object in objects:
 
             modifiers_to_apply = filter_func(object)
@@ -460,9 +766,20 @@ def _apply_modifiers(filter_func: typing.Callable, objects: typing.List['bpy.typ
                 if armature_modifier in modifiers_to_apply:
                     modifiers_to_apply.remove(armature_modifier)
 
+            if not modifiers_to_apply:
+                continue
+
+            # shape keys need to be transferred per modifier
+            if object.type == 'MESH' and not object.data.shape_keys:
+                object_to_names[object] = modifiers_to_apply
+                continue
+
             for name in modifiers_to_apply:
                 bpy_modifier.apply_modifier(object.modifiers[name])
 
+        if object_to_names:
+            _apply_modifiers_evaluated(object_to_names)
+
 
 def apply_modeling_modifiers(objects: typing.List['bpy.types.Object'], preserve_armature = False):
     _apply_modifiers(get_modelling_modifiers, objects, preserve_armature)
@@ -501,19 +818,13 @@ def get_armature_objects():
     return objects
 
 
-def get_objects_for_armature(armature: 'bpy.types.Object'):
-
-    objects: typing.List[bpy.types.Object] = []
+def get_objects_for_armature(armature: 'bpy.types.Object', index: typing.Optional[Scene_Index] = None):
+    """ Pass the same `index` when iterating over multiple armatures. """
 
-    for object in bpy.data.objects:
+    if index is None:
+        index = Scene_Index()
 
-        if object.type != 'MESH':
-            continue
-
-        if armature is object.parent or any(m.type == 'ARMATURE' and m.object is armature for m in object.modifiers):
-            objects.append(object)
-
-    return objects
+    return index.get_objects_for_armature(armature)
 
 
 class S_Deform_Armature(settings_base.Settings):
@@ -683,8 +994,10 @@ def get_root_bones(armature: 'bpy.types.Object', settings: S_Deform_Armature):
 
 def unassign_deform_bones_with_missing_weights():
 
+    index = Scene_Index()
+
     for armature in get_armature_objects():
-        meshes = get_objects_for_armature(armature)
+        meshes = get_objects_for_armature(armature, index)
         bpy_action.unassign_deform_bones_with_missing_weights(armature, meshes)
 
 
@@ -746,9 +1059,11 @@ def create_game_rig_and_bake_actions(settings: S_Deform_Armature, do_bake_animat
 
     baked_actions = []
 
+    index = Scene_Index()
+
     for armature in get_armature_objects():
 
-        meshes = get_objects_for_armature(armature)
+        meshes = get_objects_for_armature(armature, index)
 
 
         with bpy_context.Focus(armature), bpy_context.State() as state:
@@ -790,6 +1105,10 @@ def create_game_rig_and_bake_actions(settings: S_Deform_Armature, do_bake_animat
                     if modifier.object == armature:
                         modifier.object = new
 
+        # a mesh can also be deformed by the next armatures
+        index.update_objects(meshes)
+        index.remove_armature(armature)
+
         bpy.data.objects.remove(armature)
 
     bpy.data.batch_remove([a for a in bpy.data.actions if not a in baked_actions])
@@ -943,3 +1262,294 @@ def use_preview_frame_range():
 
     bpy.context.scene.frame_start = bpy.context.scene.frame_preview_start
     bpy.context.scene.frame_end = bpy.context.scene.frame_preview_end
+
+
+CHECKPOINT_ID_KEY = '_bc_checkpoint_id'
+
+CHECKPOINT_ID_TYPE_TO_DATA = {
+    'OBJECT': 'objects',
+    'MESH': 'meshes',
+    'MATERIAL': 'materials',
+    'IMAGE': 'images',
+    'COLLECTION': 'collections',
+    'ACTION': 'actions',
+    'ARMATURE': 'armatures',
+    'NODETREE': 'node_groups',
+}
+
+
+def _to_checkpoint_value(value):
+    """ Raises `TypeError` if the value cannot be restored in a new session. """
+
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+
+    elif isinstance(value, (list, tuple)):
+        return [_to_checkpoint_value(sub_value) for sub_value in value]
+
+    elif isinstance(value, dict):
+        return {key: _to_checkpoint_value(sub_value) for key, sub_value in value.items()}
+
+    elif isinstance(value, bpy.types.ID):
+
+        if value.id_type not in CHECKPOINT_ID_TYPE_TO_DATA:
+            raise TypeError(f"Unsupported ID type: {value.id_type}")
+
+        return {CHECKPOINT_ID_KEY: [value.id_type, value.name]}
+
+    elif isinstance(value, settings_base.Settings):
+        return _to_checkpoint_value(value._to_dict())
+
+    else:
+        raise TypeError(f"Unsupported type: {type(value)}")
+
+
+def _get_settings_class(name: str) -> typing.Type[settings_base.Settings]:
+    """ The bake types are not in `tool_settings`. """
+
+    from blend_converter.blender import bake_settings
+
+    for module in (tool_settings, bake_settings, sys.modules[__name__]):
+        cls = getattr(module, name, None)
+        if isinstance(cls, type) and issubclass(cls, settings_base.Settings):
+            return cls
+
+    raise TypeError(f"Unknown settings class: {name}")
+
+
+def _from_checkpoint_value(value):
+
+    if isinstance(value, list):
+        return [_from_checkpoint_value(sub_value) for sub_value in value]
+
+    elif isinstance(value, dict):
+
+        id_reference = value.get(CHECKPOINT_ID_KEY)
+        if id_reference is not None:
+            id_type, name = id_reference
+            return getattr(bpy.data, CHECKPOINT_ID_TYPE_TO_DATA[id_type])[name]
+
+        settings_name = value.get(settings_base.K_CLASS_NAME)
+        if settings_name:
+            return _get_settings_class(settings_name)._from_dict({key: _from_checkpoint_value(sub_value) for key, sub_value in value.items()})
+
+        return {key: _from_checkpoint_value(sub_value) for key, sub_value in value.items()}
+
+    else:
+        return value
+
+
+def save_checkpoint(path: str, key: str, return_values: dict):
+    """
+    Save a copy of the current state to resume from.
+
+    The sidecar with the key and the return values of the previous instructions is written after the blend, so an interrupted save is never used.
+    """
+
+    values = {}
+    unsupported = []
+
+    for identifier, value in return_values.items():
+        try:
+            values[identifier] = _to_checkpoint_value(value)
+        except TypeError:
+            unsupported.append(identifier)
+
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+
+    bpy.ops.wm.save_as_mainfile(filepath = path, copy = True)
+
+    temp_path = path + '.' + uuid.uuid1().hex
+
+    with open(temp_path, 'w', encoding = 'utf-8') as f:
+        json.dump(dict(key = key, values = values, unsupported = unsupported), f, indent = 4, ensure_ascii = False)
+
+    os.replace(temp_path, path + '.json')
+
+
+def open_checkpoint(path: str, key: str):
+
+    bpy.ops.wm.open_mainfile(filepath = path)
+
+    with open(path + '.json', encoding = 'utf-8') as f:
+        data = json.load(f)
+
+    if data['key'] != key:
+        raise Exception(f"The checkpoint is outdated: {path}")
+
+    bpy.app.driver_namespace[CHECKPOINT_ID_KEY] = data['values']
+
+
+def get_checkpoint_value(identifier: str):
+    """ Substitutes the instruction that returned the value before the checkpoint. """
+    return _from_checkpoint_value(bpy.app.driver_namespace[CHECKPOINT_ID_KEY][identifier])
+
+
+def remove_checkpoints(folder: str):
+
+    import shutil
+
+    shutil.rmtree(folder, ignore_errors = True)
+
+
+BAKE_SHARD_EXPRESSION = "; ".join([
+    "import sys, json, runpy",
+    "runpy.run_path(sys.argv[-3])['bootstrap']()",
+    "from blend_converter import serialization",
+    "serialization.Function.from_dict(json.loads(sys.argv[-2])).get()(sys.argv[-1])",
+])
+""" Executed by a worker Blender process with the arguments: `serialization.py` path, `bake_shard` function, shard path. """
+
+
+def bake_shard(shard_path: str):
+    """ Executed by a worker Blender process that has opened a copy of the parent blend. """
+
+    from blend_converter import communication
+
+    with open(shard_path, encoding = 'utf-8') as f:
+        data = json.load(f)
+
+    objects = _from_checkpoint_value(data['objects'])
+    bake_tasks: typing.List[tool_settings.S_Bake] = _from_checkpoint_value(data['tasks'])
+
+    # there is no connection to the updater, the parent has suspended the others
+    communication.Suspend_Others._depth += 1
+
+    bpy_utils.copy_and_bake(objects, bake_tasks, pre_bake_labels = data['pre_bake_labels'])
+
+    images = []
+
+    for task in bake_tasks:
+        images.append([
+            dict(
+                path = bpy.path.abspath(image.filepath_raw),
+                name = image.name,
+                colorspace = image.colorspace_settings.name,
+                alpha_mode = image.alpha_mode,
+                map_identifier = image[tool_settings.S_Bake._K_MAP_IDENTIFIER].to_dict(),
+            )
+            for image in task._images
+        ])
+
+    with open(data['result_path'], 'w', encoding = 'utf-8') as f:
+        json.dump(images, f, indent = 4, ensure_ascii = False)
+
+
+def bake_sharded(
+            objects: typing.List['bpy.types.Object'],
+            bake_tasks: typing.List['tool_settings.S_Bake'],
+            pre_bake_labels: typing.List[str] = tuple(),
+            shard_count = 2,
+        ):
+    """
+    `bpy_utils.copy_and_bake` with the bake types of the tasks split between `shard_count` worker Blender processes.
+
+    The workers open a copy of the current blend and save the images to the `image_dir` of the tasks.
+    The images are then loaded and assigned to the tasks for `bpy_utils.assign_new_materials`.
+    """
+
+    import shutil
+    import subprocess
+
+    from blend_converter import communication
+    from blend_converter import serialization
+
+    units = [(task_index, type_index) for task_index, task in enumerate(bake_tasks) for type_index in range(len(task.bake_types))]
+
+    shard_count = min(shard_count, len(units))
+
+    if not objects or shard_count <= 1:
+        bpy_utils.copy_and_bake(objects, bake_tasks, pre_bake_labels = pre_bake_labels)
+        return
+
+    folder = os.path.join(bpy.app.tempdir, '__bc_bake_shards_' + uuid.uuid1().hex)
+    os.makedirs(folder)
+
+    blend_path = os.path.join(folder, 'shard.blend')
+    bpy.ops.wm.save_as_mainfile(filepath = blend_path, copy = True)
+
+    function = json.dumps(serialization.Function.from_func(bake_shard)._to_dict())
+    threads = max((os.cpu_count() or 1) // shard_count, 1)
+
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+
+    shards: typing.List[typing.Tuple[typing.List[int], str]] = []
+    commands: typing.List[typing.List[str]] = []
+
+    for shard_index in range(shard_count):
+
+        task_indexes = []
+        tasks = []
+
+        for task_index, task in enumerate(bake_tasks):
+
+            bake_types = [task.bake_types[type_index] for _task_index, type_index in units[shard_index::shard_count] if _task_index == task_index]
+            if not bake_types:
+                continue
+
+            value = _to_checkpoint_value(task)
+            value['bake_types'] = _to_checkpoint_value(bake_types)
+
+            task_indexes.append(task_index)
+            tasks.append(value)
+
+        shard_path = os.path.join(folder, f'shard_{shard_index}.json')
+        result_path = os.path.join(folder, f'result_{shard_index}.json')
+
+        with open(shard_path, 'w', encoding = 'utf-8') as f:
+            json.dump(dict(
+                objects = _to_checkpoint_value(objects),
+                tasks = tasks,
+                pre_bake_labels = list(pre_bake_labels),
+                result_path = result_path,
+            ), f, indent = 4, ensure_ascii = False)
+
+        shards.append((task_indexes, result_path))
+
+        commands.append([
+            bpy.app.binary_path,
+            '-b',
+            '-noaudio',
+            '--factory-startup',
+            '--python-exit-code',
+            '1',
+            '-t',
+            str(threads),
+            blend_path,
+            '--python-expr',
+            BAKE_SHARD_EXPRESSION,
+            '--',
+            serialization.__file__,
+            function,
+            shard_path,
+        ])
+
+    with communication.Suspend_Others():
+
+        processes = [subprocess.Popen(command, env = env) for command in commands]
+        return_codes = [process.wait() for process in processes]
+
+    if any(return_codes):
+        raise Exception(f"Bake shards failed with the return codes: {return_codes}")
+
+    for task in bake_tasks:
+        task._images = []
+
+    for task_indexes, result_path in shards:
+
+        with open(result_path, encoding = 'utf-8') as f:
+            images: typing.List[typing.List[dict]] = json.load(f)
+
+        for task_index, task_images in zip(task_indexes, images):
+            for item in task_images:
+
+                image = bpy.data.images.load(item['path'], check_existing = True)
+                image.name = item['name']
+                image.colorspace_settings.name = item['colorspace']
+                image.alpha_mode = item['alpha_mode']
+                image[tool_settings.S_Bake._K_MAP_IDENTIFIER] = item['map_identifier']
+
+                bake_tasks[task_index]._images.append(image)
+
+    shutil.rmtree(folder, ignore_errors = True)
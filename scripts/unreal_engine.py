@@ -1,8 +1,6 @@
 import os
 import sys
 import typing
-import operator
-import collections
 
 from . import unreal_material
 from .. import configuration
@@ -20,7 +18,6 @@ if 'bpy' in sys.modules:
     from blend_converter.blender import bpy_context
     from blend_converter.blender import bpy_material
     from blend_converter.blender import bpy_action
-    from blend_converter.blender import bpy_uv
 
 
 
@@ -38,6 +35,8 @@ if typing.TYPE_CHECKING:
     import dataclasses
 
     import typing_extensions
+
+    import numpy as np
 else:
     class dataclasses:
         dataclass = lambda x: x
@@ -71,6 +70,63 @@ def is_in_memory_asset(asset_path: str):
     return asset_registry.get_asset_by_object_path(asset_path, include_only_on_disk_assets=True) == asset_registry.get_asset_by_object_path(asset_path, include_only_on_disk_assets=False)
 
 
+class Asset_Folder_Snapshot:
+    """ The assets of a folder, scanned once. """
+
+
+    def __init__(self, package_path: str):
+
+        asset_registry: unreal.AssetRegistry = unreal.AssetRegistryHelpers.get_asset_registry()
+        asset_registry.scan_paths_synchronous([package_path], force_rescan = True)
+
+        self.on_disk_assets = {str(data.package_name) for data in asset_registry.get_assets_by_path(package_path, recursive = False, include_only_on_disk_assets = True)}
+        self.assets = {str(data.package_name) for data in asset_registry.get_assets_by_path(package_path, recursive = False, include_only_on_disk_assets = False)}
+
+
+    def does_asset_exist(self, asset_path: str):
+        return asset_path in self.assets
+
+
+    def is_in_memory_asset(self, asset_path: str):
+        """ The asset is loaded but is not on disk. """
+        return asset_path in self.assets and not asset_path in self.on_disk_assets
+
+
+    def add_saved_asset(self, asset_path: str):
+        self.assets.add(asset_path)
+        self.on_disk_assets.add(asset_path)
+
+
+class Asset_Preflight:
+    """ Answer the asset existence questions of an import batch from a single scan of each destination folder. """
+
+
+    def __init__(self):
+        self.folders: typing.Dict[str, Asset_Folder_Snapshot] = {}
+        self.directories: typing.Dict[str, bool] = {}
+
+
+    def get_folder(self, package_path: str):
+
+        folder = self.folders.get(package_path)
+
+        if folder is None:
+            unreal.EditorAssetLibrary.make_directory(package_path)
+            folder = self.folders[package_path] = Asset_Folder_Snapshot(package_path)
+
+        return folder
+
+
+    def does_directory_exist(self, directory_path: str):
+
+        is_existing = self.directories.get(directory_path)
+
+        if is_existing is None:
+            is_existing = self.directories[directory_path] = unreal.EditorAssetLibrary.does_directory_exist(directory_path)
+
+        return is_existing
+
+
 def get_import_task(options, filename: str, destination_path: str, destination_name: str):
 
     task = unreal.AssetImportTask()
@@ -139,10 +195,7 @@ class S_Unreal_Fbx(tool_settings.Settings):
         return unreal.Paths.combine((self.destination_folder, self.destination_name))
 
 
-def import_static_mesh(settings: S_Unreal_Fbx):
-
-    settings = S_Unreal_Fbx._from_dict(settings)
-
+def get_static_mesh_import_task(settings: S_Unreal_Fbx):
 
     options = unreal.FbxImportUI()
 
@@ -163,14 +216,12 @@ def import_static_mesh(settings: S_Unreal_Fbx):
     import_data.set_editor_property('reorder_material_to_fbx_order', True)
     options.set_editor_property('static_mesh_import_data', import_data)
 
-
-    task = get_import_task(options, settings.fbx_path, settings.destination_folder, settings.destination_name)
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
+    return get_import_task(options, settings.fbx_path, settings.destination_folder, settings.destination_name)
 
 
-    asset: unreal.StaticMesh = get_task_assets(task)[0]
+def set_up_static_mesh(settings: S_Unreal_Fbx, asset: unreal.StaticMesh, preflight: typing.Optional[Asset_Preflight] = None):
 
-    materials = unreal_material.create_materials(settings.material_definitions, settings.destination_folder, is_skeletal = False)
+    materials = unreal_material.create_materials(settings.material_definitions, settings.destination_folder, is_skeletal = False, preflight = preflight)
     unreal_material.set_static_mesh_materials(asset, materials.values())
 
     unreal.EditorAssetLibrary.save_loaded_asset(asset, only_if_is_dirty = False)
@@ -178,9 +229,7 @@ def import_static_mesh(settings: S_Unreal_Fbx):
     unreal.log(f"Static Mesh imported: {settings}")
 
 
-def import_skeletal_mesh(settings: S_Unreal_Fbx):
-
-    settings = S_Unreal_Fbx._from_dict(settings)
+def get_skeletal_mesh_import_task(settings: S_Unreal_Fbx):
 
     options = unreal.FbxImportUI()
 
@@ -199,13 +248,12 @@ def import_skeletal_mesh(settings: S_Unreal_Fbx):
     import_data.set_editor_property('reorder_material_to_fbx_order', True)
     options.set_editor_property('skeletal_mesh_import_data', import_data)
 
+    return get_import_task(options, settings.fbx_path, settings.destination_folder, settings.destination_name)
 
-    task = get_import_task(options, settings.fbx_path, settings.destination_folder, settings.destination_name)
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
 
-    asset: unreal.SkeletalMesh = get_task_assets(task)[0]
+def set_up_skeletal_mesh(settings: S_Unreal_Fbx, asset: unreal.SkeletalMesh, preflight: typing.Optional[Asset_Preflight] = None):
 
-    materials = unreal_material.create_materials(settings.material_definitions, settings.destination_folder, is_skeletal = True)
+    materials = unreal_material.create_materials(settings.material_definitions, settings.destination_folder, is_skeletal = True, preflight = preflight)
     unreal_material.set_skeletal_mesh_materials(asset, materials)
 
 
@@ -221,6 +269,343 @@ def import_skeletal_mesh(settings: S_Unreal_Fbx):
     unreal.log(f"Skeletal Mesh imported: {settings}")
 
 
+class Import_Kind:
+    STATIC_MESH = 'static_mesh'
+    SKELETAL_MESH = 'skeletal_mesh'
+
+
+IMPORT_KIND_TO_FUNCTIONS = {
+    Import_Kind.STATIC_MESH: (get_static_mesh_import_task, set_up_static_mesh),
+    Import_Kind.SKELETAL_MESH: (get_skeletal_mesh_import_task, set_up_skeletal_mesh),
+}
+""" The import task getter and the function that creates the materials and saves the imported asset. """
+
+
+def submit_import_tasks(tasks: typing.List[unreal.AssetImportTask]):
+    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(tasks)
+
+
+def import_fbx_batch(items: typing.List[typing.Tuple[str, dict]], submit = submit_import_tasks):
+    """
+    Import the `(Import_Kind, S_Unreal_Fbx)` items with a single `import_asset_tasks` call, then create the materials in the same order.
+
+    A failed item does not stop the rest of the batch. Returns an error message per item, empty if the item has been imported.
+    """
+
+    items = [(kind, S_Unreal_Fbx._from_dict(settings)) for kind, settings in items]
+
+    errors = [''] * len(items)
+    tasks: typing.Dict[int, unreal.AssetImportTask] = {}
+
+    for index, (kind, settings) in enumerate(items):
+        try:
+            tasks[index] = IMPORT_KIND_TO_FUNCTIONS[kind][0](settings)
+        except Exception as e:
+            errors[index] = f"Fail to create the import task: {e}"
+
+    try:
+        submit(list(tasks.values()))
+    except Exception as e:
+        errors = [error or f"Fail to import the batch: {e}" for error in errors]
+        tasks.clear()
+
+    preflight = Asset_Preflight()
+
+    for index, task in tasks.items():
+
+        kind, settings = items[index]
+
+        try:
+            assets = get_task_assets(task)
+            if not assets:
+                raise Exception(f"Nothing is imported: {settings}")
+
+            IMPORT_KIND_TO_FUNCTIONS[kind][1](settings, assets[0], preflight)
+
+        except Exception as e:
+            errors[index] = str(e)
+
+    for (kind, settings), error in zip(items, errors):
+        if error:
+            unreal.log_error(f"Fail to import: {settings}\n{error}")
+
+    return errors
+
+
+def import_static_mesh(settings: S_Unreal_Fbx):
+
+    with Interchange_Disabled():
+        error = import_fbx_batch([(Import_Kind.STATIC_MESH, settings)])[0]
+        if error:
+            raise Exception(error)
+
+
+def import_skeletal_mesh(settings: S_Unreal_Fbx):
+
+    with Interchange_Disabled():
+        error = import_fbx_batch([(Import_Kind.SKELETAL_MESH, settings)])[0]
+        if error:
+            raise Exception(error)
+
+
+IMPORT_OUTCOME_EXT = '.ue_import.json'
+
+
+def get_import_outcome_path(fbx_path: str):
+    return fbx_path + IMPORT_OUTCOME_EXT
+
+
+def write_import_outcome(fbx_path: str, error = ''):
+    """ Read by `wait_for_import` of the program that has queued the import. """
+
+    import json
+    import uuid
+
+    path = get_import_outcome_path(fbx_path)
+    temp_path = f"{path}.{uuid.uuid1().hex}"
+
+    with open(temp_path, 'w', encoding = 'utf-8') as f:
+        json.dump(dict(error = error), f, ensure_ascii = False)
+
+    os.replace(temp_path, path)
+
+
+def remove_import_outcome(fbx_path: str):
+
+    try:
+        os.remove(get_import_outcome_path(fbx_path))
+    except FileNotFoundError:
+        pass
+
+
+def wait_for_import(fbx_path: str, timeout = 60 * 60.0, poll_interval = 1.0):
+    """
+    Executed outside of the editor after the program has queued its import, see `queue_import`.
+
+    Fails the program if its import has failed, or has not been done in `timeout` seconds, e.g. the editor has been closed.
+    """
+
+    import json
+    import time
+
+    path = get_import_outcome_path(fbx_path)
+
+    deadline = time.monotonic() + timeout
+
+    while True:
+
+        try:
+            with open(path, encoding = 'utf-8') as f:
+                outcome = json.load(f)
+            break
+        except (OSError, ValueError):
+            pass
+
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"The queued import has not been done in {timeout} seconds: {fbx_path}")
+
+        time.sleep(poll_interval)
+
+    if outcome['error']:
+        raise Exception(f"The queued import has failed: {fbx_path}\n{outcome['error']}")
+
+
+IMPORT_TIMEOUT_IDLE_DELAYS = 30
+
+
+def get_import_timeout(idle_delay: float):
+    """
+    The `wait_for_import` timeout of a program that has queued its import with `idle_delay`.
+
+    Enough for the idle flush of a partial queue and the import of the batch, a queue stalled by an editor that does not tick fails in minutes, not in an hour.
+    """
+    return idle_delay * IMPORT_TIMEOUT_IDLE_DELAYS
+
+
+SESSION_MODULE_NAME = '_blend_converter_template_unreal_session'
+""" The script runner drops all the `blend_converter*` modules before each execution, so the state shared by the programs lives in a module of its own. """
+
+
+def get_session():
+    """ The state of the current editor session. """
+
+    session = sys.modules.get(SESSION_MODULE_NAME)
+
+    if session is None:
+
+        import types
+
+        session = types.ModuleType(SESSION_MODULE_NAME)
+
+        session.import_queue = {}
+        """ `(Import_Kind, S_Unreal_Fbx)` by the destination asset path, in the order of queueing. """
+
+        session.init_interchange = None
+        """ The value of `INTERCHANGE_FLAG` before it has been turned off, `None` if it is not turned off. """
+
+        session.last_activity_time = 0.0
+        session.idle_delay = 10.0
+        session.tick_handle = None
+
+        sys.modules[SESSION_MODULE_NAME] = session
+
+        unreal.register_python_shutdown_callback(on_editor_shutdown)
+
+    return session
+
+
+def begin_import_session(idle_delay = 10.0):
+    """
+    Keep the Interchange FBX import turned off between the imports of the programs rather than toggling it per asset, see `Interchange_Disabled`.
+
+    The session ends after `idle_delay` seconds without the Unreal instructions: the queued imports are flushed and the flag is restored.
+    The flag is also restored right away if an import raises, and when the editor is closed, so it does not depend on the editor ticking.
+    """
+
+    import time
+
+    session = get_session()
+
+    session.last_activity_time = time.monotonic()
+    session.idle_delay = idle_delay
+
+    if session.tick_handle is None:
+        session.tick_handle = unreal.register_slate_post_tick_callback(on_session_tick)
+
+
+def end_import_session():
+
+    session = get_session()
+
+    if session.tick_handle is not None:
+        unreal.unregister_slate_post_tick_callback(session.tick_handle)
+        session.tick_handle = None
+
+    try:
+        flush_import_queue()
+    finally:
+        restore_interchange()
+
+
+def restore_interchange():
+
+    session = get_session()
+
+    if session.init_interchange is not None:
+        set_console_variable_bool_value(INTERCHANGE_FLAG, session.init_interchange)
+        session.init_interchange = None
+
+
+def on_session_tick(delta_seconds: float):
+
+    import time
+
+    session = get_session()
+
+    if time.monotonic() - session.last_activity_time < session.idle_delay:
+        return
+
+    try:
+        end_import_session()
+    except Exception as e:
+        unreal.log_error(str(e))
+        show_nt_message('Queued import failed!', e)
+
+
+def on_editor_shutdown():
+    """ The queued imports are lost, fail the waiting programs right away. """
+
+    session = get_session()
+
+    for kind, settings in session.import_queue.values():
+        write_import_outcome(settings['fbx_path'], "The editor has been closed before the import.")
+
+    session.import_queue.clear()
+
+    restore_interchange()
+
+
+class Interchange_Disabled:
+    """
+    Turn off the Interchange FBX import for the block unless it is already turned off.
+
+    The flag is restored when the block raises, or when it exits and no import session is open, otherwise the session restores it.
+    """
+
+
+    def __enter__(self):
+
+        session = get_session()
+
+        self.is_owner = session.init_interchange is None
+
+        if self.is_owner:
+            session.init_interchange = get_console_variable_bool_value(INTERCHANGE_FLAG)
+            set_console_variable_bool_value(INTERCHANGE_FLAG, False)
+
+
+    def __exit__(self, type, value, traceback):
+
+        if type is not None:
+            restore_interchange()
+        elif self.is_owner and get_session().tick_handle is None:
+            restore_interchange()
+
+
+def queue_import(kind: str, settings: S_Unreal_Fbx, batch_size = 32, idle_delay = 10.0):
+    """
+    Queue the import into the editor session and import the whole queue once it has `batch_size` items.
+
+    The rest is imported when the session ends, see `begin_import_session`, or with `flush_import_queue`.
+    A re-queued asset replaces the previous item and moves to the end of the queue.
+
+    The outcome of each item is written next to its FBX, the program waits for it with `wait_for_import`.
+    """
+
+    settings = S_Unreal_Fbx._from_dict(settings)
+
+    begin_import_session(idle_delay)
+
+    session = get_session()
+
+    remove_import_outcome(settings.fbx_path)
+
+    key = join_path(settings.destination_folder, settings.destination_name)
+
+    prev_item = session.import_queue.pop(key, None)
+    if prev_item and prev_item[1]['fbx_path'] != settings.fbx_path:
+        write_import_outcome(prev_item[1]['fbx_path'], f"Replaced by a later import of the same asset: {settings.fbx_path}")
+
+    session.import_queue[key] = (kind, settings._to_dict())
+
+    unreal.log(f"Import queued {len(session.import_queue)}/{batch_size}: {key}")
+
+    if len(session.import_queue) >= batch_size:
+        flush_import_queue()
+
+
+def flush_import_queue(importer = import_fbx_batch):
+    """ Import the queued items and write their outcomes, a failed item fails only the program that has queued it. """
+
+    session = get_session()
+
+    items = list(session.import_queue.values())
+    session.import_queue.clear()
+
+    if not items:
+        return
+
+    unreal.log(f"Importing the queued batch of {len(items)} assets.")
+
+    try:
+        with Interchange_Disabled():
+            errors = importer(items)
+    except Exception as e:
+        errors = [f"Fail to import the batch: {e}"] * len(items)
+
+    for (kind, settings), error in zip(items, errors):
+        write_import_outcome(settings['fbx_path'], error)
+
 
 def import_anim_sequence(settings: S_Unreal_Fbx):
 
@@ -238,6 +623,9 @@ def import_anim_sequence(settings: S_Unreal_Fbx):
     options.set_editor_property('automated_import_should_detect_type', False)
     options.set_editor_property('mesh_type_to_import', unreal.FBXImportType.FBXIT_ANIMATION)
 
+    # the skeletal mesh can still be in the import queue
+    flush_import_queue()
+
     skeleton = unreal.load_asset(settings.skeleton_asset_path)
     if not skeleton:
         raise Exception(f"Fail to load Skeleton: {settings}")
@@ -251,7 +639,9 @@ def import_anim_sequence(settings: S_Unreal_Fbx):
 
     task = get_import_task(options, settings.fbx_path, settings.destination_folder, settings.destination_name)
     task.save = True
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
+
+    with Interchange_Disabled():
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
 
     unreal.log(f"Animation Sequence imported: {settings}")
 
@@ -271,22 +661,6 @@ def show_nt_message(title, message):
     subprocess.Popen([unreal.get_interpreter_executable_path(), '-c', code, str(message), str(title)], creationflags = subprocess.CREATE_NO_WINDOW)
 
 
-def get_bone_custom_shapes():
-
-    shapes: typing.Set[bpy.types.Object] = set()
-
-    for o in bpy.data.objects:
-
-        if o.type != 'ARMATURE':
-            continue
-
-        for bone in o.pose.bones:
-            if bone.custom_shape:
-                shapes.add(bone.custom_shape)
-
-    return shapes
-
-
 def reduce_to_single_mesh(collection_name: str):
 
     scene_objects = list(bpy.context.scene.objects)
@@ -294,7 +668,7 @@ def reduce_to_single_mesh(collection_name: str):
     collision_shapes = set(o for o in scene_objects if o.get(configuration.UNREAL_COLLISION_PROP_KEY))
 
     mesh_objects = set(o for o in scene_objects if o.type == 'MESH')
-    mesh_objects -= get_bone_custom_shapes()
+    mesh_objects -= bake_scripts.get_bone_custom_shapes()
     mesh_objects -= collision_shapes
 
     with bpy_context.Focus(mesh_objects):
@@ -318,78 +692,263 @@ def reduce_to_single_mesh(collection_name: str):
     bpy_context.Focus([single_object] + list(collision_shapes)).__enter__().visible_collection.name = collection_name
 
 
-def get_group_to_face_indexes_map(mesh: 'bpy.types.Object'):
+class Vertex_Group_Map:
+    """
+    The vertex group memberships of the faces of a mesh as CSR arrays.
+
+    A face belongs to a group if any of its vertices does, regardless of the weight.
+    """
+
+
+    def __init__(self, mesh: 'bpy.types.Object'):
+
+        import numpy as np
+
+        polygons = mesh.data.polygons
+        vertices = mesh.data.vertices
+
+        self.group_names: typing.List[str] = [group.name for group in mesh.vertex_groups]
+        self.face_count = len(polygons)
+
+        group_count = len(self.group_names)
+
+
+        ## face → vertices
+        loop_starts = np.empty(self.face_count, dtype = np.int64)
+        polygons.foreach_get('loop_start', loop_starts)
+
+        self.loop_totals = np.empty(self.face_count, dtype = np.int64)
+        polygons.foreach_get('loop_total', self.loop_totals)
+
+        loop_vertices = np.empty(len(mesh.data.loops), dtype = np.int64)
+        mesh.data.loops.foreach_get('vertex_index', loop_vertices)
+
+        # the loops of a face are contiguous
+        face_loops = np.repeat(loop_starts - np.cumsum(self.loop_totals) + self.loop_totals, self.loop_totals) + np.arange(int(self.loop_totals.sum()))
+        face_loop_faces = np.repeat(np.arange(self.face_count), self.loop_totals)
+        face_loop_vertices = loop_vertices[face_loops]
 
-    vert_to_face_map: typing.Dict[int, typing.Set[int]] = collections.defaultdict(set)
-    for face in mesh.data.polygons:
-        for vert in face.vertices:
-            vert_to_face_map[vert].add(face.index)
 
-    result: typing.Dict[str, typing.Set[int]] = collections.defaultdict(set)
+        ## vertex → groups
+        vertex_group_counts = np.fromiter((len(vertex.groups) for vertex in vertices), dtype = np.int64, count = len(vertices))
+        vertex_groups = np.fromiter((group.group for vertex in vertices for group in vertex.groups), dtype = np.int64, count = int(vertex_group_counts.sum()))
+        vertex_weights = np.fromiter((group.weight for vertex in vertices for group in vertex.groups), dtype = np.float64, count = len(vertex_groups))
 
-    for vert in mesh.data.vertices:
+        vertex_group_offsets = np.cumsum(vertex_group_counts) - vertex_group_counts
+
+
+        ## face vertex → groups
+        counts = vertex_group_counts[face_loop_vertices]
+        elements = np.repeat(vertex_group_offsets[face_loop_vertices] - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
+
+        self.pair_faces = np.repeat(face_loop_faces, counts)
+        """ The face of each face vertex group membership. """
+        self.pair_groups = vertex_groups[elements]
+        self.pair_weights = vertex_weights[elements]
+
+
+        ## unique group face pairs
+        keys, inverse = np.unique(self.pair_groups * self.face_count + self.pair_faces, return_inverse = True)
+
+        groups = keys // max(self.face_count, 1)
+        faces = keys % max(self.face_count, 1)
+
+        self.group_offsets = np.concatenate(([0], np.cumsum(np.bincount(groups, minlength = group_count))))
+        self.group_faces = faces
+
+        self.group_face_weights = np.bincount(inverse.reshape(-1), weights = self.pair_weights, minlength = len(keys)) / self.loop_totals[faces]
+        """ The average vertex weights of the faces in the group, aligned with `group_faces`. """
+
+        order = np.argsort(faces, kind = 'stable')
+
+        self.face_offsets = np.concatenate(([0], np.cumsum(np.bincount(faces, minlength = self.face_count))))
+        self.face_groups = groups[order]
+
+
+    def get_faces(self, group_index: int):
+        """ Ascending face indexes. """
+        return self.group_faces[self.group_offsets[group_index]:self.group_offsets[group_index + 1]]
+
+
+    def get_groups(self, face_index: int):
+        """ Ascending group indexes. """
+        return self.face_groups[self.face_offsets[face_index]:self.face_offsets[face_index + 1]]
+
+
+class Group_To_Faces(typing.Mapping[str, typing.Sequence[int]]):
+    """
+    A group name to face indexes mapping of the groups that have faces.
+
+    Any group of the mesh can be looked up, a group without faces gets an empty `int64` array.
+    """
 
-        group_indexes: typing.List[int] = list(map(operator.attrgetter('group'), vert.groups))
 
-        for index in group_indexes:
+    def __init__(self, vertex_group_map: Vertex_Group_Map):
+        self.map = vertex_group_map
+        self.name_to_index = {name: index for index, name in enumerate(vertex_group_map.group_names)}
+        self.names_with_faces = [name for index, name in enumerate(vertex_group_map.group_names) if vertex_group_map.group_offsets[index] != vertex_group_map.group_offsets[index + 1]]
 
-            result[mesh.vertex_groups[index].name].update(vert_to_face_map[vert.index])
 
-    return result
+    def __getitem__(self, name: str):
+        return self.map.get_faces(self.name_to_index[name])
+
+
+    def __contains__(self, name: str):
+        return name in self.name_to_index and len(self[name]) > 0
+
+
+    def __iter__(self):
+        return iter(self.names_with_faces)
+
+
+    def __len__(self):
+        return len(self.names_with_faces)
+
+
+class Face_To_Groups(typing.Mapping[int, typing.Set[str]]):
+    """
+    A face index to group names mapping of the faces that have groups.
+
+    Any face of the mesh can be looked up, a face without groups gets an empty `set`.
+    """
+
+
+    def __init__(self, vertex_group_map: Vertex_Group_Map):
+        self.map = vertex_group_map
+
+
+    def __getitem__(self, index: int):
+
+        if not 0 <= index < self.map.face_count:
+            raise KeyError(index)
+
+        return {self.map.group_names[group] for group in self.map.get_groups(index).tolist()}
+
+
+    def __iter__(self):
+
+        import numpy as np
+
+        return iter(np.flatnonzero(np.diff(self.map.face_offsets)).tolist())
+
+
+    def __len__(self):
+
+        import numpy as np
+
+        return int(np.count_nonzero(np.diff(self.map.face_offsets)))
+
+
+def get_group_to_face_indexes_map(mesh: 'bpy.types.Object'):
+    return Group_To_Faces(Vertex_Group_Map(mesh))
 
 
 def get_face_group_map(mesh: 'bpy.types.Object'):
 
-    face_to_groups: typing.Dict[int, typing.Set[str]] = collections.defaultdict(set)
+    vertex_group_map = Vertex_Group_Map(mesh)
+
+    return Face_To_Groups(vertex_group_map), Group_To_Faces(vertex_group_map)
+
+
+def get_segment_weighted_medians(values: 'np.ndarray', weights: 'np.ndarray', segments: 'np.ndarray', segment_starts: 'np.ndarray', counts: 'np.ndarray'):
+    """
+    The weighted median of each segment of `values`, the same interpolation as `bpy_uv.get_weighted_percentile`.
+
+    `segments` is the ascending segment index of each value, no segment is empty.
+    A segment with zero total weight gets `nan`.
+    """
+
+    import numpy as np
+
+    # one sort by segment, then by value: the values are scaled below the step between the segment indexes
+    span = np.ptp(values)
+    order = np.argsort(segments + (values - values.min()) / (2 * span if span > 0 else 1))
+
+    sorted_values = values[order]
+    sorted_weights = weights[order]
+
+    cumulative = np.concatenate(([0.0], np.cumsum(sorted_weights)))
 
-    group_to_faces = get_group_to_face_indexes_map(mesh)
+    segment_ends = segment_starts + counts
+    targets = (cumulative[segment_starts] + cumulative[segment_ends]) / 2
 
-    for group, face_indexes in group_to_faces.items():
-        for index in face_indexes:
-            face_to_groups[index].add(group)
+    # not normalized per segment, so the quantiles of all the segments are ascending as a whole
+    quantiles = cumulative[:-1] + 0.5 * sorted_weights
 
-    return face_to_groups, group_to_faces
+
+    ## the quantiles around the 0.5 crossing, clamped to the segment
+    lower = np.clip(np.searchsorted(quantiles, targets, side = 'right') - 1, segment_starts, segment_ends - 1)
+    upper = np.minimum(lower + 1, segment_ends - 1)
+
+    span = quantiles[upper] - quantiles[lower]
+    ratio = np.clip((targets - quantiles[lower]) / np.where(span > 0, span, 1), 0, 1)
+
+    medians = sorted_values[lower] + ratio * (sorted_values[upper] - sorted_values[lower])
+
+    return np.where(cumulative[segment_ends] > cumulative[segment_starts], medians, np.nan)
 
 
 def get_group_to_center(
         mesh: 'bpy.types.Object',
         names: typing.Set[str],
-        group_to_faces: typing.Dict[str, typing.Set[int]],
-        vertex_to_groups: typing.Dict[int, typing.Dict[int, float]]
+        group_to_faces: Group_To_Faces,
     ):
+    """
+    The center of the face closest to the weighted median of the face centers of the group.
+    The face weight is the average of its vertex weights.
 
-    result: typing.Dict[str, mathutils.Vector] = {}
+    The faces, weights and locations of all the groups are gathered and measured at once.
+    A group without faces has no center.
+    """
 
-    for name in names:
+    import numpy as np
 
-        face_indexes = group_to_faces[name]
-        group_index = mesh.vertex_groups.get(name).index
+    names = sorted(name for name in names if name in group_to_faces)
 
-        locations: typing.List[mathutils.Vector] = []
-        weights: typing.List[float] = []
+    if not names:
+        return {}
 
-        for index in face_indexes:
-            polygon = mesh.data.polygons[index]
-            locations.append(polygon.center)
-            weights.append(sum(vertex_to_groups[vertex].get(group_index, 0) for vertex in polygon.vertices) / len(polygon.vertices))
+    vertex_group_map = group_to_faces.map
+    polygons = mesh.data.polygons
 
-        try:
-            group_center = mathutils.Vector([
-                bpy_uv.get_weighted_percentile(tuple(map(operator.itemgetter(0), locations)), 0.5, weights),
-                bpy_uv.get_weighted_percentile(tuple(map(operator.itemgetter(1), locations)), 0.5, weights),
-                bpy_uv.get_weighted_percentile(tuple(map(operator.itemgetter(2), locations)), 0.5, weights),
-            ])
-        except RuntimeWarning as e:
-            print(e)
-            group_center = sum((l for l in locations), start = mathutils.Vector()) / len(locations)
+    centers = np.empty(len(polygons) * 3, dtype = np.float32)
+    polygons.foreach_get('center', centers)
+    centers = centers.reshape(-1, 3)
+
+
+    ## the faces of the groups, concatenated
+    group_indexes = np.array([group_to_faces.name_to_index[name] for name in names])
+
+    starts = vertex_group_map.group_offsets[group_indexes]
+    counts = vertex_group_map.group_offsets[group_indexes + 1] - starts
 
+    segment_starts = np.cumsum(counts) - counts
+    segments = np.repeat(np.arange(len(names)), counts)
 
-        pairs = list(zip(face_indexes, locations))
-        pairs.sort(key = lambda x: (x[1] - group_center).length_squared)
+    elements = np.repeat(starts - segment_starts, counts) + np.arange(int(counts.sum()))
 
-        result[name] = pairs[0][1]
+    faces = vertex_group_map.group_faces[elements]
+    weights = vertex_group_map.group_face_weights[elements]
+    locations = centers[faces].astype(np.float64)
 
-    return result
+
+    ## weighted medians, the weightless groups fall back to the mean
+    group_centers = np.add.reduceat(locations, segment_starts) / counts[:, None]
+
+    for axis in range(3):
+        medians = get_segment_weighted_medians(locations[:, axis], weights, segments, segment_starts, counts)
+        group_centers[:, axis] = np.where(np.isnan(medians), group_centers[:, axis], medians)
+
+
+    ## the closest faces, the lowest face index on a tie
+    distances = np.square(locations - group_centers[segments]).sum(axis = 1)
+
+    is_closest = distances == np.repeat(np.minimum.reduceat(distances, segment_starts), counts)
+    closest = np.flatnonzero(is_closest)
+
+    closest_faces = faces[closest[np.searchsorted(closest, segment_starts)]]
+
+    return {name: mathutils.Vector(centers[face].tolist()) for name, face in zip(names, closest_faces.tolist())}
 
 
 def ensure_bone_count_limit_per_material(limit = 75, max_attempts = 100):
@@ -421,6 +980,7 @@ def ensure_bone_count_limit_per_material(limit = 75, max_attempts = 100):
     """
 
     armatures = bake_scripts.get_armature_objects()
+    index = bake_scripts.Scene_Index()
 
     with bpy_context.Focus(armatures):
 
@@ -428,149 +988,178 @@ def ensure_bone_count_limit_per_material(limit = 75, max_attempts = 100):
 
             deform_bone_names = set(b.name for b in armature.data.bones if b.use_deform)
 
-            for mesh in bake_scripts.get_objects_for_armature(armature):
+            for mesh in bake_scripts.get_objects_for_armature(armature, index):
 
-                face_to_groups, group_to_faces = get_face_group_map(mesh)
+                group_to_faces = get_group_to_face_indexes_map(mesh)
                 deform_group_names = {group.name for group in mesh.vertex_groups if group.name in deform_bone_names}
                 print(f"Bone count: {len(deform_group_names)}")
 
 
                 deform_groups = deform_group_names.intersection(group_to_faces)
 
-                vertex_to_groups: typing.Dict[int, typing.Dict[int, float]] = {vert.index: {g.group: g.weight for g in vert.groups} for vert in mesh.data.vertices}
+                group_to_center = get_group_to_center(mesh, deform_groups, group_to_faces)
+
+                split_materials_by_bone_count(mesh, group_to_faces, group_to_center, limit, max_attempts)
+
 
-                group_to_center = get_group_to_center(mesh, deform_groups, group_to_faces, vertex_to_groups)
+def get_bit_count(bits: int):
+    return bin(bits).count('1')
 
-                def get_sorted_face_indexes(group_name: str):
-                    group_center = group_to_center[group_name]
-                    polygons = mesh.data.polygons
-                    return sorted(group_to_faces[group_name], key = lambda i: (polygons[i].center - group_center).length_squared)
 
-                group_to_sorted_indexes = {name: get_sorted_face_indexes(name) for name in deform_groups}
+def get_bit_indexes(bits: int):
 
+    indexes: typing.List[int] = []
 
-                def get_connected_groups(group_name: str):
+    while bits:
+        lowest = bits & -bits
+        indexes.append(lowest.bit_length() - 1)
+        bits ^= lowest
 
-                    groups = set()
+    return indexes
 
-                    for i in group_to_faces[group_name]:
-                        groups.update(deform_group_names.intersection(face_to_groups[i]))
 
-                    return len(groups)
+def split_materials_by_bone_count(
+        mesh: 'bpy.types.Object',
+        group_to_faces: 'Group_To_Faces',
+        group_to_center: typing.Dict[str, 'mathutils.Vector'],
+        limit: int,
+        max_attempts: int,
+    ):
+    """
+    Move the faces of the materials that exceed the bone limit into new material slots.
 
-                group_to_connected_count = {name: get_connected_groups(name) for name in deform_groups}
+    The faces are grown from the bone group with the most connected groups, closest to the group center first.
+    The groups of a face are a bitset, the polygon data is read and written in bulk.
+    """
 
+    import numpy as np
 
-                has_over_limit_materials = True
-                attempt_count = 0
-                good_materials = set()
+    polygons = mesh.data.polygons
+    face_count = len(polygons)
 
-                while has_over_limit_materials:
+    centers = np.empty(face_count * 3, dtype = np.float32)
+    polygons.foreach_get('center', centers)
+    centers = centers.reshape(-1, 3).astype(np.float64)
 
-                    if attempt_count > max_attempts:
-                        raise Exception(f"Fail to split materials: {mesh.name_full}")
+    material_indexes = np.empty(face_count, dtype = np.int32)
+    polygons.foreach_get('material_index', material_indexes)
 
-                    has_over_limit_materials = False
 
+    group_names = sorted(group_to_center)
 
-                    material_index_to_face_indexes_map: typing.Dict[int, typing.List[int]] = collections.defaultdict(list)
-                    for face in mesh.data.polygons:
-                        material_index_to_face_indexes_map[face.material_index].append(face.index)
+    face_groups = np.zeros((face_count, len(group_names)), dtype = bool)
+    group_faces: typing.List['np.ndarray'] = []
 
+    for group_index, name in enumerate(group_names):
+        faces = np.asarray(group_to_faces[name], dtype = np.int64)
+        face_groups[faces, group_index] = True
+        group_faces.append(faces)
 
-                    for material_slot in mesh.material_slots:
+    face_bits = [int.from_bytes(row.tobytes(), 'little') for row in np.packbits(face_groups, axis = 1, bitorder = 'little')]
 
-                        if material_slot.slot_index in good_materials:
-                            continue
+    group_to_sorted_faces: typing.List[typing.List[int]] = []
+    group_to_connected_count: typing.List[int] = []
 
-                        face_indexes = set(material_index_to_face_indexes_map[material_slot.slot_index])
+    for group_index, faces in enumerate(group_faces):
 
+        distances = np.square(centers[faces] - np.array(group_to_center[group_names[group_index]])).sum(axis = 1)
+        group_to_sorted_faces.append(faces[np.argsort(distances, kind = 'stable')].tolist())
 
-                        groups: typing.Set[str] = set()
-                        for index in face_indexes:
-                            groups.update(deform_group_names.intersection(face_to_groups[index]))
+        group_to_connected_count.append(int(face_groups[faces].any(axis = 0).sum()))
 
 
-                        if len(groups) <= limit:
-                            good_materials.add(material_slot.slot_index)
-                            continue
+    has_over_limit_materials = True
+    attempt_count = 0
+    good_materials = set()
+
+    while has_over_limit_materials:
 
-                        bc_utils.print_in_color(bc_utils.get_color_code(224, 51, 29, 10, 10, 10),
-                            f"Bone limit per material excited."
-                            "\n\t" f"Limit: {limit}"
-                            "\n\t" f"Object: {mesh.name_full}"
-                            "\n\t" f"Slot Index: {material_slot.slot_index}"
-                            "\n\t" f"Material: {material_slot.material.name_full}"
-                            "\n\t" f"Bone count: {len(groups)}"
-                        )
+        if attempt_count > max_attempts:
+            raise Exception(f"Fail to split materials: {mesh.name_full}")
 
-                        has_over_limit_materials = True
+        has_over_limit_materials = False
 
-                        mesh.data.materials.append(None)
-                        new_slot = mesh.material_slots[-1]
-                        new_slot.material = material_slot.material
+        for material_slot in mesh.material_slots:
 
+            if material_slot.slot_index in good_materials:
+                continue
 
-                        sorted_groups = list(groups)
-                        sorted_groups.sort(key = group_to_connected_count.get, reverse = True)
+            is_in_material = material_indexes == material_slot.slot_index
 
+            groups = np.flatnonzero(face_groups[is_in_material].any(axis = 0)).tolist()
 
-                        def assign_new_material():
+            if len(groups) <= limit:
+                good_materials.add(material_slot.slot_index)
+                continue
 
-                            faces_assigned = 0
-                            groups_in_new_material = set()
-                            processed_faces = set()
+            bc_utils.print_in_color(bc_utils.get_color_code(224, 51, 29, 10, 10, 10),
+                f"Bone limit per material excited."
+                "\n\t" f"Limit: {limit}"
+                "\n\t" f"Object: {mesh.name_full}"
+                "\n\t" f"Slot Index: {material_slot.slot_index}"
+                "\n\t" f"Material: {material_slot.material.name_full}"
+                "\n\t" f"Bone count: {len(groups)}"
+            )
 
-                            for start in sorted_groups:
+            has_over_limit_materials = True
 
-                                stack = [start]
-                                processed = set()
+            mesh.data.materials.append(None)
+            new_slot = mesh.material_slots[-1]
+            new_slot.material = material_slot.material
 
-                                while stack:
+            new_slot_index = new_slot.slot_index
 
-                                    group = stack.pop()
+            groups.sort(key = group_to_connected_count.__getitem__, reverse = True)
 
-                                    if group in processed:
-                                        continue
+            is_in_material = is_in_material.tolist()
+            processed_faces = bytearray(face_count)
+            new_material_bits = 0
 
-                                    processed.add(group)
+            for start in groups:
 
-                                    for i in group_to_sorted_indexes[group]:
+                stack = [start]
+                processed = set()
 
-                                        if not i in face_indexes:
-                                            continue
+                while stack:
 
-                                        if i in processed_faces:
-                                            continue
+                    group = stack.pop()
 
-                                        processed_faces.add(i)
+                    if group in processed:
+                        continue
 
-                                        new_groups = deform_group_names.intersection(face_to_groups[i])
+                    processed.add(group)
 
-                                        if len(new_groups | groups_in_new_material) > limit:
-                                            continue
+                    for i in group_to_sorted_faces[group]:
 
-                                        mesh.data.polygons[i].material_index = new_slot.slot_index
-                                        faces_assigned += 1
+                        if not is_in_material[i] or processed_faces[i]:
+                            continue
 
-                                        groups_in_new_material.update(new_groups)
+                        processed_faces[i] = 1
 
-                                        stack.extend(new_groups)
+                        bits = face_bits[i] | new_material_bits
+
+                        if bits != new_material_bits and get_bit_count(bits) > limit:
+                            continue
 
+                        material_indexes[i] = new_slot_index
+                        new_material_bits = bits
 
+                        stack.extend(get_bit_indexes(face_bits[i]))
 
-                        assign_new_material()
+            break
 
-                        break
+        attempt_count += 1
 
-                    attempt_count += 1
+    polygons.foreach_set('material_index', material_indexes)
 
 
 def limit_total_bone_weights(limit = 4):
 
+    index = bake_scripts.Scene_Index()
+
     for armature in bake_scripts.get_armature_objects():
 
-        for mesh in bake_scripts.get_objects_for_armature(armature):
+        for mesh in bake_scripts.get_objects_for_armature(armature, index):
 
             with bpy_context.Focus(mesh, 'WEIGHT_PAINT'):
                 bpy.ops.object.vertex_group_normalize_all(group_select_mode='BONE_DEFORM', lock_active=False)
@@ -594,6 +1183,22 @@ def join_all_mesh_objects(collection_name: str, objects: typing.List['bpy.types.
     bpy_context.Focus(all_objects).__enter__().visible_collection.name = collection_name
 
 
+def scale_keyframe_values(fcurve: 'bpy.types.FCurve', factor: float):
+    """ Scale the values of the keyframes and their handles, read and written in bulk. """
+
+    import numpy as np
+
+    keyframe_points = fcurve.keyframe_points
+
+    # multiplied in double precision, as the per key assignment does
+    values = np.empty(len(keyframe_points) * 2, dtype = np.float64)
+
+    for attribute in ('co', 'handle_left', 'handle_right'):
+        keyframe_points.foreach_get(attribute, values)
+        values[1::2] *= factor
+        keyframe_points.foreach_set(attribute, values)
+
+
 def scale_armature(factor: float):
 
     bpy.context.scene.tool_settings.use_keyframe_insert_auto = False  # this is for the inspection
@@ -629,10 +1234,7 @@ def scale_armature(factor: float):
     for action in bpy.data.actions:
         for fcurve in bpy_action.iter_fcurves(action):
             if fcurve.data_path.endswith('location'):
-                for key in fcurve.keyframe_points:
-                    key.co.y *= factor
-                    key.handle_left.y *= factor
-                    key.handle_right.y *= factor
+                scale_keyframe_values(fcurve, factor)
 
 
 def get_frame_rate():
@@ -642,12 +1244,13 @@ def get_frame_rate():
 def ensure_single_root_bone(name = f"__bc_root", assign_default_weights = False):
     """ Create a default single root bone to satisfy the Unreal Engine's requirement. """
 
-    def are_all_vertices_have_groups(object: bpy.types.Object, bone_names: set[str]):
-        return all(not set(object.vertex_groups[group.group].name for group in v.groups).isdisjoint(bone_names) for v in object.data.vertices)
+    def get_vertices_without_bone_groups(object: bpy.types.Object, bone_names: typing.Set[str]):
+
+        is_bone_group = [group.name in bone_names for group in object.vertex_groups]
+
+        return [vertex.index for vertex in object.data.vertices if not any(is_bone_group[group.group] for group in vertex.groups)]
 
-    def create_root_vertex_group(object: bpy.types.Object, bone_names: set[str], root_bone_name: str):
-        default_group = object.vertex_groups.new(name = root_bone_name)
-        default_group.add([v.index for v in object.data.vertices if set(object.vertex_groups[group.group].name for group in v.groups).isdisjoint(bone_names)], 1, 'ADD')
+    index = bake_scripts.Scene_Index()
 
     for armature in bake_scripts.get_armature_objects():
 
@@ -660,12 +1263,13 @@ def ensure_single_root_bone(name = f"__bc_root", assign_default_weights = False)
         use_deform = False
 
         if assign_default_weights:
-            meshes = bake_scripts.get_objects_for_armature(armature)
+            meshes = bake_scripts.get_objects_for_armature(armature, index)
             bone_names = {bone.name for bone in armature.data.bones}
             for mesh in meshes:
-                if not are_all_vertices_have_groups(mesh, bone_names):
-                    create_root_vertex_group(mesh, bone_names, name)
-                    use_deform = use_deform or True
+                vertex_indexes = get_vertices_without_bone_groups(mesh, bone_names)
+                if vertex_indexes:
+                    mesh.vertex_groups.new(name = name).add(vertex_indexes, 1, 'ADD')
+                    use_deform = True
 
         with bpy_context.Focus(armature, 'EDIT'):
 
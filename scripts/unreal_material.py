@@ -1,8 +1,8 @@
 import os
 import sys
+import json
 import typing
 import uuid
-import functools
 
 
 from . import unreal_engine
@@ -191,14 +191,154 @@ def sanitize_material_names():
         material.name = name
 
 
-@functools.lru_cache(None)
-def import_texture(os_path: str, ue_dir: str, name: typing.Optional[str] = None, **editor_property) -> 'unreal.Texture':
+TEXTURE_REGISTRY_NAME = 'blend_converter_texture_registry.json'
+
+
+def get_file_sha256(path: str):
+
+    import hashlib
+
+    hash = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hash.update(chunk)
+
+    return hash.hexdigest()
+
+
+class Texture_Registry:
+    """
+    The imported textures by the content hash of the source file, the name and the import options.
+
+    Shared by all the assets and kept in the project `Saved` folder between the editor sessions.
+    The textures are imported into a shared folder under a name derived from the key, so a changed file gets a new asset rather than replacing the one the other assets use.
+    """
+
+
+    def __init__(self, path: str, max_file_hashes = 10000):
+
+        self.path = path
+
+        self.file_hashes: typing.Dict[str, list] = {}
+        """ `[size, mtime_ns, sha256]` by the source file path, the least recently used first. """
+
+        self.max_file_hashes = max_file_hashes
+
+        self.asset_paths: typing.Dict[str, str] = {}
+        """ The texture asset path by the key. """
+
+        self.load()
+
+
+    def load(self):
+
+        try:
+            with open(self.path, encoding = 'utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.file_hashes.update((path, value) for path, value in data.get('file_hashes', {}).items() if os.path.exists(path))
+        self.asset_paths.update(data.get('asset_paths', {}))
+
+
+    def save(self):
+
+        temp_path = f"{self.path}.{uuid.uuid1().hex}"
+
+        try:
+            with open(temp_path, 'w', encoding = 'utf-8') as f:
+                json.dump(dict(file_hashes = self.file_hashes, asset_paths = self.asset_paths), f, indent = 4, ensure_ascii = False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            unreal.log_warning(f"Cannot save the texture registry: {e}")
+
+
+    def get_file_hash(self, os_path: str):
+        """ Reuse the previous hash if the size and mtime did not change. """
+
+        os_path = os.path.realpath(os_path)
+        stat = os.stat(os_path)
+
+        prev = self.file_hashes.pop(os_path, None)
+        if prev and prev[0] == stat.st_size and prev[1] == stat.st_mtime_ns:
+            sha256 = prev[2]
+        else:
+            sha256 = get_file_sha256(os_path)
+
+        self.file_hashes[os_path] = [stat.st_size, stat.st_mtime_ns, sha256]
+
+        while len(self.file_hashes) > self.max_file_hashes:
+            del self.file_hashes[next(iter(self.file_hashes))]
+
+        return sha256
+
+
+    def get_key(self, os_path: str, name: typing.Optional[str], editor_property: dict):
+        options = {key: str(value) for key, value in editor_property.items()}
+        return json.dumps([self.get_file_hash(os_path), name, options], sort_keys = True)
+
+
+    @staticmethod
+    def get_asset_name(key: str, name: str):
+        """ `<name>_<hash8>`, unique per key. """
+
+        import hashlib
+
+        return f"{name}_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:8]}"
+
+
+    def get_asset(self, key: str) -> typing.Optional['unreal.Texture']:
+
+        asset_path = self.asset_paths.get(key)
+        if not asset_path:
+            return None
+
+        if not unreal.EditorAssetLibrary.does_asset_exist(asset_path):
+            return None
+
+        return unreal.load_asset(asset_path)
+
+
+    def set_asset_path(self, key: str, asset_path: str):
+
+        self.asset_paths[key] = asset_path
+
+        self.save()
+
+
+def get_texture_registry() -> Texture_Registry:
+    """ Loaded once per editor session. """
+
+    session = unreal_engine.get_session()
+
+    registry = getattr(session, 'texture_registry', None)
+    if registry is None:
+        saved_dir = unreal.Paths.convert_relative_path_to_full(unreal.Paths.project_saved_dir())
+        registry = session.texture_registry = Texture_Registry(os.path.join(saved_dir, TEXTURE_REGISTRY_NAME))
+
+    return registry
+
+
+def import_texture(os_path: str, name: typing.Optional[str] = None, ue_dir: str = configuration.Folder.UNREAL_SHARED_TEXTURES, **editor_property) -> 'unreal.Texture':
+    """ Re-use the texture imported for another asset unless the source file has changed, see `Texture_Registry`. """
+
+    registry = get_texture_registry()
+
+    registry_key = registry.get_key(os_path, name, editor_property)
+
+    asset = registry.get_asset(registry_key)
+    if asset:
+        return asset
 
     if name:
         dest_ue_name = name
     else:
         dest_ue_name = 'T_' + os.path.splitext(os.path.basename(os_path))[0]
 
+    dest_ue_name = registry.get_asset_name(registry_key, dest_ue_name)
+
     task = unreal.AssetImportTask()
 
     task.automated = True
@@ -222,6 +362,8 @@ def import_texture(os_path: str, ue_dir: str, name: typing.Optional[str] = None,
 
     unreal.EditorAssetLibrary.save_loaded_asset(asset, only_if_is_dirty = False)
 
+    registry.set_asset_path(registry_key, asset.get_path_name())
+
     return asset
 
 
@@ -316,17 +458,22 @@ def create_material_instance(*,
             emission_filepath = '',
             is_alpha = False,
             is_skeletal = False,
+            preflight: typing.Optional['unreal_engine.Asset_Preflight'] = None,
         ) -> unreal.MaterialInstanceConstant:
+    """ `preflight`: shared by the material instances of an import batch, otherwise the folder is scanned for each instance. """
 
-    unreal.EditorAssetLibrary.make_directory(package_path)
+    if preflight is None:
+        preflight = unreal_engine.Asset_Preflight()
+
+    folder = preflight.get_folder(package_path)
 
     asset_path = unreal.Paths.combine([package_path, asset_name])  # TODO: might not be correct
 
-    if unreal_engine.is_in_memory_asset(asset_path):
+    if folder.is_in_memory_asset(asset_path):
         raise Exception(f"In memory asset, restart Unreal Engine: {asset_path}")  # TODO: testing
 
 
-    do_replace = unreal.EditorAssetLibrary.does_asset_exist(asset_path)
+    do_replace = folder.does_asset_exist(asset_path)
     if do_replace:
         asset_name = asset_name + f"_TEMP_{uuid.uuid1().hex}"
     else:
@@ -346,7 +493,7 @@ def create_material_instance(*,
         raise Exception(f"Fail to create Material Instance: {asset_path}")
 
 
-    has_manual_permutations = unreal.EditorAssetLibrary.does_directory_exist('/Game/Materials/manual_permutations')
+    has_manual_permutations = preflight.does_directory_exist('/Game/Materials/manual_permutations')
 
     if has_manual_permutations:
         parent_material_path = get_parent_material_permutation_path(
@@ -374,7 +521,6 @@ def create_material_instance(*,
     if normal_filepath:
         texture = import_texture(
             normal_filepath,
-            package_path,
             compression_settings = unreal.TextureCompressionSettings.TC_NORMALMAP,
             flip_green_channel = True,
             srgb = False,
@@ -394,7 +540,6 @@ def create_material_instance(*,
     if base_color_filepath:
         texture = import_texture(
             base_color_filepath,
-            package_path,
             compression_settings = unreal.TextureCompressionSettings.TC_DEFAULT,
         )
         unreal.MaterialEditingLibrary.set_material_instance_texture_parameter_value(material_instance, Material_Parameter.BASE_COLOR, texture)
@@ -403,7 +548,6 @@ def create_material_instance(*,
     if orma_filepath:
         texture = import_texture(
             orma_filepath,
-            package_path,
             compression_settings = unreal.TextureCompressionSettings.TC_MASKS,
             srgb = False,
         )
@@ -413,7 +557,6 @@ def create_material_instance(*,
     if emission_filepath:
         texture = import_texture(
             emission_filepath,
-            package_path,
             compression_settings = unreal.TextureCompressionSettings.TC_DEFAULT,
         )
         unreal.MaterialEditingLibrary.set_material_instance_texture_parameter_value(material_instance, Material_Parameter.EMISSION, texture)
@@ -441,13 +584,16 @@ def create_material_instance(*,
             unreal.EditorAssetLibrary.delete_asset(asset_path)
             unreal.EditorAssetLibrary.rename_asset(material_instance.get_full_name(), asset_path)
 
+    folder.add_saved_asset(asset_path)
+
 
     return material_instance
 
 
-def create_materials(material_definitions: dict, package_path: str, is_skeletal: bool) -> typing.Dict[str, unreal.MaterialInstanceConstant]:
+def create_materials(material_definitions: dict, package_path: str, is_skeletal: bool, preflight: typing.Optional['unreal_engine.Asset_Preflight'] = None) -> typing.Dict[str, unreal.MaterialInstanceConstant]:
 
-    import_texture.cache_clear()
+    if preflight is None:
+        preflight = unreal_engine.Asset_Preflight()
 
     name_to_material: typing.Dict[str, unreal.MaterialInstanceConstant] = {}
 
@@ -464,6 +610,7 @@ def create_materials(material_definitions: dict, package_path: str, is_skeletal:
             emission_filepath = definition.emission,
             is_alpha = definition.is_alpha,
             is_skeletal = is_skeletal,
+            preflight = preflight,
         )
 
     return {slot_name: name_to_material[name] for slot_name, name in material_definitions['slot_name_to_name'].items()}
@@ -0,0 +1,60 @@
+"""
+The weighted medians of the bone count split, per segment loop against `get_segment_weighted_medians`.
+
+    python tests/benchmark_segment_weighted_medians.py
+"""
+
+import timeit
+
+import numpy as np
+
+import conftest
+
+conftest.import_package()
+
+import test_segment_weighted_medians
+
+from blend_converter_template.scripts import unreal_engine
+
+
+FACE_COUNT = 120_000
+GROUP_COUNTS = (150, 1000)
+FACES_PER_GROUP = 4
+
+REPEAT = 5
+
+
+def benchmark(group_count: int):
+
+    rng = np.random.default_rng(0)
+
+    # every face is in a few groups
+    counts = np.bincount(rng.integers(0, group_count, size = FACE_COUNT * FACES_PER_GROUP), minlength = group_count)
+    segment_starts = np.cumsum(counts) - counts
+    segments = np.repeat(np.arange(group_count), counts)
+
+    locations = rng.normal(size = (len(segments), 3))
+    weights = rng.random(len(segments))
+
+    def loop():
+        for axis in range(3):
+            test_segment_weighted_medians.get_weighted_medians_per_segment(locations[:, axis], weights, segment_starts, counts)
+
+    def vectorized():
+        for axis in range(3):
+            unreal_engine.get_segment_weighted_medians(locations[:, axis], weights, segments, segment_starts, counts)
+
+    print(f"{len(segments)} group faces, {group_count} groups, 3 axes")
+
+    for name, function in (('loop', loop), ('vectorized', vectorized)):
+        seconds = min(timeit.repeat(function, number = 1, repeat = REPEAT))
+        print(f"    {name}: {seconds * 1000:.1f} ms")
+
+
+def main():
+    for group_count in GROUP_COUNTS:
+        benchmark(group_count)
+
+
+if __name__ == '__main__':
+    main()
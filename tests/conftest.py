@@ -0,0 +1,49 @@
+"""
+The repository is imported as the `blend_converter_template` package, the way the launcher does it.
+
+The scripts need `blend_converter`, the tests that import them are skipped without it.
+"""
+
+import os
+import sys
+import importlib.util
+
+import pytest
+
+import unreal_stand_in
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+PACKAGE_NAME = 'blend_converter_template'
+
+
+def import_package():
+
+    if PACKAGE_NAME in sys.modules:
+        return
+
+    spec = importlib.util.spec_from_file_location(PACKAGE_NAME, os.path.join(ROOT, '__init__.py'), submodule_search_locations = [ROOT])
+    module = importlib.util.module_from_spec(spec)
+
+    sys.modules[PACKAGE_NAME] = module
+    spec.loader.exec_module(module)
+
+
+unreal_stand_in.install()
+
+import_package()
+
+
+@pytest.fixture
+def editor():
+    """ A fresh editor session. """
+
+    from blend_converter_template.scripts import unreal_engine
+
+    unreal_stand_in.reset()
+    sys.modules.pop(unreal_engine.SESSION_MODULE_NAME, None)
+
+    yield unreal_stand_in
+
+    sys.modules.pop(unreal_engine.SESSION_MODULE_NAME, None)
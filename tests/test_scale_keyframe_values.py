@@ -0,0 +1,93 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('blend_converter')
+
+from blend_converter_template.scripts import unreal_engine
+
+
+ATTRIBUTES = ('co', 'handle_left', 'handle_right')
+
+
+class Vector:
+    """ A Blender vector, the components are stored in single precision. """
+
+
+    def __init__(self, array: 'np.ndarray'):
+        self.array = array
+
+
+    @property
+    def y(self):
+        return float(self.array[1])
+
+
+    @y.setter
+    def y(self, value: float):
+        self.array[1] = value
+
+
+class Keyframe:
+
+
+    def __init__(self, keyframe_points: 'Keyframe_Points', index: int):
+        for attribute in ATTRIBUTES:
+            setattr(self, attribute, Vector(keyframe_points.arrays[attribute][index]))
+
+
+class Keyframe_Points:
+
+
+    def __init__(self, arrays: dict):
+        self.arrays = {attribute: array.astype(np.float32) for attribute, array in arrays.items()}
+
+
+    def __len__(self):
+        return len(self.arrays['co'])
+
+
+    def __iter__(self):
+        return (Keyframe(self, index) for index in range(len(self)))
+
+
+    def foreach_get(self, attribute: str, values: 'np.ndarray'):
+        values[:] = self.arrays[attribute].ravel()
+
+
+    def foreach_set(self, attribute: str, values: 'np.ndarray'):
+        self.arrays[attribute][:] = np.asarray(values).reshape(-1, 2)
+
+
+class FCurve:
+
+
+    def __init__(self, arrays: dict):
+        self.keyframe_points = Keyframe_Points(arrays)
+
+
+def scale_keyframe_values_per_key(fcurve: FCurve, factor: float):
+    """ The previous implementation. """
+    for key in fcurve.keyframe_points:
+        key.co.y *= factor
+        key.handle_left.y *= factor
+        key.handle_right.y *= factor
+
+
+@pytest.mark.parametrize('factor', [100, 0.01, 1 / 3, -2.5])
+@pytest.mark.parametrize('count', [0, 1, 257])
+def test_matches_the_per_key_loop(factor: float, count: int):
+
+    rng = np.random.default_rng(count)
+
+    arrays = {attribute: rng.normal(scale = 10, size = (count, 2)) for attribute in ATTRIBUTES}
+
+    expected = FCurve(arrays)
+    scale_keyframe_values_per_key(expected, factor)
+
+    result = FCurve(arrays)
+    unreal_engine.scale_keyframe_values(result, factor)
+
+    for attribute in ATTRIBUTES:
+        # the frames are not scaled
+        np.testing.assert_array_equal(result.keyframe_points.arrays[attribute][:, 0], FCurve(arrays).keyframe_points.arrays[attribute][:, 0])
+        np.testing.assert_array_equal(result.keyframe_points.arrays[attribute], expected.keyframe_points.arrays[attribute])
@@ -0,0 +1,86 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('blend_converter')
+
+from blend_converter_template.scripts import unreal_engine
+
+
+def get_weighted_medians_per_segment(values: 'np.ndarray', weights: 'np.ndarray', segment_starts: 'np.ndarray', counts: 'np.ndarray'):
+    """ The previous implementation. """
+
+    medians = np.full(len(counts), np.nan)
+
+    for index, (start, count) in enumerate(zip(segment_starts.tolist(), counts.tolist())):
+
+        segment_weights = weights[start:start + count]
+
+        total = segment_weights.sum()
+        if total == 0:
+            continue
+
+        segment_values = values[start:start + count]
+        order = np.argsort(segment_values, kind = 'stable')
+
+        sorted_weights = segment_weights[order]
+        quantiles = (np.cumsum(sorted_weights) - 0.5 * sorted_weights) / total
+
+        medians[index] = np.interp(0.5, quantiles, segment_values[order])
+
+    return medians
+
+
+def get_segments(rng: 'np.random.Generator', segment_count: int, max_count: int):
+
+    counts = rng.integers(1, max_count + 1, size = segment_count)
+    segment_starts = np.cumsum(counts) - counts
+    segments = np.repeat(np.arange(segment_count), counts)
+
+    return segments, segment_starts, counts
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_the_per_segment_loop(seed: int):
+
+    rng = np.random.default_rng(seed)
+
+    segments, segment_starts, counts = get_segments(rng, segment_count = 50, max_count = 40)
+
+    # zero weights
+    values = rng.normal(scale = 10, size = len(segments))
+    weights = rng.random(len(segments)) * (rng.random(len(segments)) > 0.3)
+
+    # weightless segments
+    weights[np.isin(segments, rng.choice(len(counts), size = 5, replace = False))] = 0
+
+    expected = get_weighted_medians_per_segment(values, weights, segment_starts, counts)
+    result = unreal_engine.get_segment_weighted_medians(values, weights, segments, segment_starts, counts)
+
+    np.testing.assert_allclose(result, expected, rtol = 0, atol = 1e-9)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_equal_values_of_equal_weight(seed: int):
+    """ The order of the equal values is not defined, their weights are the same. """
+
+    rng = np.random.default_rng(seed)
+
+    segments, segment_starts, counts = get_segments(rng, segment_count = 20, max_count = 40)
+
+    values = rng.integers(-5, 5, size = len(segments)).astype(np.float64)
+    weights = np.ones(len(segments))
+
+    expected = get_weighted_medians_per_segment(values, weights, segment_starts, counts)
+    result = unreal_engine.get_segment_weighted_medians(values, weights, segments, segment_starts, counts)
+
+    np.testing.assert_allclose(result, expected, rtol = 0, atol = 1e-9)
+
+
+def test_single_value_segments():
+
+    values = np.array([3.0, -1.0, 2.0])
+    weights = np.array([0.5, 0.0, 1.0])
+
+    result = unreal_engine.get_segment_weighted_medians(values, weights, np.arange(3), np.arange(3), np.ones(3, dtype = np.int64))
+
+    np.testing.assert_array_equal(result, [3.0, np.nan, 2.0])
@@ -0,0 +1,194 @@
+import os
+
+import pytest
+
+pytest.importorskip('blend_converter')
+
+from blend_converter_template.scripts import unreal_engine
+
+
+pytestmark = pytest.mark.usefixtures('editor')
+
+
+EMPTY_MATERIAL_DEFINITIONS = dict(name_to_definition = {}, slot_name_to_name = {})
+
+
+def queue(tmp_path, name: str, batch_size = 3, idle_delay = 100.0, kind = unreal_engine.Import_Kind.STATIC_MESH):
+
+    settings = unreal_engine.S_Unreal_Fbx(
+        fbx_path = os.path.join(tmp_path, name + '.fbx'),
+        destination_folder = '/Game/props/' + name,
+        destination_name = name,
+        material_definitions = EMPTY_MATERIAL_DEFINITIONS,
+    )
+
+    unreal_engine.queue_import(kind, settings._to_dict(), batch_size, idle_delay)
+
+    return settings.fbx_path
+
+
+def get_batches(editor):
+    return [[os.path.basename(filename) for filename in batch.filenames] for batch in editor.ASSET_TOOLS.batches]
+
+
+def test_full_batch_is_imported_in_queue_order(tmp_path, editor):
+
+    paths = [queue(tmp_path, name) for name in ('a', 'b')]
+    assert get_batches(editor) == []
+
+    paths.append(queue(tmp_path, 'c'))
+    assert get_batches(editor) == [['a.fbx', 'b.fbx', 'c.fbx']]
+
+    assert editor.SAVED_ASSETS == ['/Game/props/a/a', '/Game/props/b/b', '/Game/props/c/c']
+
+    for path in paths:
+        unreal_engine.wait_for_import(path, timeout = 0)
+
+
+def test_requeued_asset_moves_to_the_end(tmp_path, editor):
+
+    queue(tmp_path, 'a')
+    queue(tmp_path, 'b')
+    queue(tmp_path, 'a')
+
+    assert get_batches(editor) == []
+
+    queue(tmp_path, 'c')
+
+    assert get_batches(editor) == [['b.fbx', 'a.fbx', 'c.fbx']]
+
+
+def test_idle_session_imports_the_rest(tmp_path, editor):
+
+    path = queue(tmp_path, 'a', idle_delay = 0)
+
+    editor.tick()
+
+    assert get_batches(editor) == [['a.fbx']]
+    assert editor.TICK_CALLBACKS == {}
+
+    unreal_engine.wait_for_import(path, timeout = 0)
+
+
+def test_interchange_is_disabled_during_the_import_and_restored(tmp_path, editor):
+
+    queue(tmp_path, 'a', idle_delay = 0)
+
+    editor.tick()
+
+    assert editor.ASSET_TOOLS.batches[0].console_variables[unreal_engine.INTERCHANGE_FLAG] is False
+    assert editor.CONSOLE_VARIABLES[unreal_engine.INTERCHANGE_FLAG] is True
+
+
+def test_failed_item_fails_only_its_own_program(tmp_path, editor):
+
+    editor.ASSET_TOOLS.failing_filenames.add(os.path.join(tmp_path, 'b.fbx'))
+
+    paths = [queue(tmp_path, name) for name in ('a', 'b', 'c')]
+
+    unreal_engine.wait_for_import(paths[0], timeout = 0)
+    unreal_engine.wait_for_import(paths[2], timeout = 0)
+
+    with pytest.raises(Exception, match = 'Nothing is imported'):
+        unreal_engine.wait_for_import(paths[1], timeout = 0)
+
+
+def test_requeue_clears_the_previous_outcome(tmp_path, editor):
+
+    editor.ASSET_TOOLS.failing_filenames.add(os.path.join(tmp_path, 'a.fbx'))
+
+    path = queue(tmp_path, 'a', batch_size = 1)
+
+    with pytest.raises(Exception):
+        unreal_engine.wait_for_import(path, timeout = 0)
+
+    queue(tmp_path, 'a')
+
+    with pytest.raises(TimeoutError):
+        unreal_engine.wait_for_import(path, timeout = 0)
+
+
+def test_editor_shutdown_fails_the_waiting_programs(tmp_path, editor):
+
+    path = queue(tmp_path, 'a')
+
+    editor.shut_down()
+
+    with pytest.raises(Exception, match = 'closed'):
+        unreal_engine.wait_for_import(path, timeout = 0)
+
+
+def test_stalled_queue_times_out_after_a_few_idle_delays(tmp_path, editor):
+
+    idle_delay = 0.001
+
+    # the editor does not tick
+    path = queue(tmp_path, 'a', idle_delay = idle_delay)
+
+    with pytest.raises(TimeoutError):
+        unreal_engine.wait_for_import(path, unreal_engine.get_import_timeout(idle_delay), poll_interval = idle_delay)
+
+
+def test_single_import_raises(tmp_path, editor):
+
+    editor.ASSET_TOOLS.failing_filenames.add(os.path.join(tmp_path, 'a.fbx'))
+
+    settings = unreal_engine.S_Unreal_Fbx(
+        fbx_path = os.path.join(tmp_path, 'a.fbx'),
+        destination_folder = '/Game/props/a',
+        destination_name = 'a',
+        material_definitions = EMPTY_MATERIAL_DEFINITIONS,
+    )
+
+    with pytest.raises(Exception, match = 'Nothing is imported'):
+        unreal_engine.import_static_mesh(settings._to_dict())
+
+
+def import_static_mesh(tmp_path, name: str):
+
+    settings = unreal_engine.S_Unreal_Fbx(
+        fbx_path = os.path.join(tmp_path, name + '.fbx'),
+        destination_folder = '/Game/props/' + name,
+        destination_name = name,
+        material_definitions = EMPTY_MATERIAL_DEFINITIONS,
+    )
+
+    unreal_engine.import_static_mesh(settings._to_dict())
+
+
+def test_interchange_is_restored_after_the_import_without_a_session(tmp_path, editor):
+
+    import_static_mesh(tmp_path, 'a')
+
+    assert editor.ASSET_TOOLS.batches[0].console_variables[unreal_engine.INTERCHANGE_FLAG] is False
+    assert editor.CONSOLE_VARIABLES[unreal_engine.INTERCHANGE_FLAG] is True
+
+
+def test_session_toggles_interchange_once_and_restores_it_on_shutdown(tmp_path, editor):
+
+    for name in ('a', 'b'):
+        unreal_engine.begin_import_session()
+        import_static_mesh(tmp_path, name)
+
+    commands = [command for command in editor.CONSOLE_COMMANDS if command.startswith(unreal_engine.INTERCHANGE_FLAG)]
+    assert commands == [unreal_engine.INTERCHANGE_FLAG + ' False']
+
+    # the editor has not ticked
+    editor.shut_down()
+
+    assert editor.CONSOLE_VARIABLES[unreal_engine.INTERCHANGE_FLAG] is True
+
+
+def test_failed_import_restores_interchange_right_away(tmp_path, editor):
+
+    editor.ASSET_TOOLS.failing_filenames.add(os.path.join(tmp_path, 'b.fbx'))
+
+    unreal_engine.begin_import_session()
+    import_static_mesh(tmp_path, 'a')
+
+    assert editor.CONSOLE_VARIABLES[unreal_engine.INTERCHANGE_FLAG] is False
+
+    with pytest.raises(Exception, match = 'Nothing is imported'):
+        import_static_mesh(tmp_path, 'b')
+
+    assert editor.CONSOLE_VARIABLES[unreal_engine.INTERCHANGE_FLAG] is True
@@ -0,0 +1,138 @@
+import os
+
+import pytest
+
+pytest.importorskip('blend_converter')
+
+from blend_converter_template import configuration
+from blend_converter_template.scripts import unreal_engine
+from blend_converter_template.scripts import unreal_material
+
+
+pytestmark = pytest.mark.usefixtures('editor')
+
+
+@pytest.fixture(autouse = True)
+def texture_registry(tmp_path, editor):
+
+    editor.ASSETS[unreal_material.UE_Material.OPAQUE] = editor.Asset(unreal_material.UE_Material.OPAQUE)
+
+    registry = unreal_material.Texture_Registry(os.path.join(tmp_path, unreal_material.TEXTURE_REGISTRY_NAME))
+    unreal_engine.get_session().texture_registry = registry
+
+    return registry
+
+
+def write_texture(tmp_path, name: str, content = b'trim sheet'):
+
+    path = os.path.join(tmp_path, name)
+
+    with open(path, 'wb') as f:
+        f.write(content)
+
+    return path
+
+
+def create_material_instance(package_path: str, asset_name = 'MI_prop', preflight = None, **filepaths):
+    return unreal_material.create_material_instance(asset_name = asset_name, package_path = package_path, preflight = preflight, **filepaths)
+
+
+def test_props_in_different_folders_share_the_texture(tmp_path, editor):
+
+    trim_sheet = write_texture(tmp_path, 'trim_sheet.png')
+
+    a = create_material_instance('/Game/props/a', base_color_filepath = trim_sheet)
+    b = create_material_instance('/Game/props/b', base_color_filepath = trim_sheet)
+
+    assert editor.IMPORTED_FILENAMES == [trim_sheet]
+
+    texture = a.texture_parameters[unreal_material.Material_Parameter.BASE_COLOR]
+    assert texture is b.texture_parameters[unreal_material.Material_Parameter.BASE_COLOR]
+    assert texture.get_path_name().startswith(configuration.Folder.UNREAL_SHARED_TEXTURES)
+
+
+def test_same_content_from_another_file_is_not_imported_again(tmp_path, editor):
+
+    create_material_instance('/Game/props/a', base_color_filepath = write_texture(tmp_path, 'a.png'))
+    create_material_instance('/Game/props/b', base_color_filepath = write_texture(tmp_path, 'b.png'))
+
+    assert len(editor.IMPORTED_FILENAMES) == 1
+
+
+def test_changed_file_does_not_replace_the_shared_texture(tmp_path, editor):
+
+    trim_sheet = write_texture(tmp_path, 'trim_sheet.png')
+
+    a = create_material_instance('/Game/props/a', base_color_filepath = trim_sheet)
+
+    write_texture(tmp_path, 'trim_sheet.png', b'changed trim sheet')
+
+    b = create_material_instance('/Game/props/b', base_color_filepath = trim_sheet)
+
+    assert editor.IMPORTED_FILENAMES == [trim_sheet, trim_sheet]
+
+    a_texture = a.texture_parameters[unreal_material.Material_Parameter.BASE_COLOR]
+    b_texture = b.texture_parameters[unreal_material.Material_Parameter.BASE_COLOR]
+
+    assert a_texture.get_path_name() != b_texture.get_path_name()
+    assert a_texture.get_path_name() in editor.ASSETS
+
+
+def test_import_options_are_a_part_of_the_key(tmp_path, editor):
+
+    texture = write_texture(tmp_path, 'texture.png')
+
+    create_material_instance('/Game/props/a', base_color_filepath = texture)
+    create_material_instance('/Game/props/b', orma_filepath = texture)
+
+    assert editor.IMPORTED_FILENAMES == [texture, texture]
+
+
+def test_registry_is_kept_between_sessions(tmp_path, editor, texture_registry):
+
+    trim_sheet = write_texture(tmp_path, 'trim_sheet.png')
+
+    create_material_instance('/Game/props/a', base_color_filepath = trim_sheet)
+
+    unreal_engine.get_session().texture_registry = unreal_material.Texture_Registry(texture_registry.path)
+
+    create_material_instance('/Game/props/b', base_color_filepath = trim_sheet)
+
+    assert editor.IMPORTED_FILENAMES == [trim_sheet]
+
+
+def test_one_scan_for_the_instances_of_a_folder(editor):
+
+    preflight = unreal_engine.Asset_Preflight()
+
+    for asset_name in ('MI_a', 'MI_b', 'MI_c'):
+        create_material_instance('/Game/props/a', asset_name = asset_name, preflight = preflight)
+
+    assert editor.SCANNED_PATHS == ['/Game/props/a']
+    assert editor.ON_DISK_ASSETS == {'/Game/props/a/MI_a', '/Game/props/a/MI_b', '/Game/props/a/MI_c'}
+
+
+def test_replaced_instance_is_not_in_memory(editor):
+
+    preflight = unreal_engine.Asset_Preflight()
+
+    first = create_material_instance('/Game/props/a', preflight = preflight)
+
+    # the next slot of the batch and the next batch
+    second = create_material_instance('/Game/props/a', preflight = preflight)
+    third = create_material_instance('/Game/props/a')
+
+    assert editor.SCANNED_PATHS == ['/Game/props/a', '/Game/props/a']
+
+    assert first is not second and second is not third
+    assert list(editor.ASSETS) == [unreal_material.UE_Material.OPAQUE, '/Game/props/a/MI_prop']
+    assert editor.ON_DISK_ASSETS == {'/Game/props/a/MI_prop'}
+    assert third.get_path_name() == '/Game/props/a/MI_prop'
+
+
+def test_in_memory_asset_is_not_replaced(editor):
+
+    editor.ASSETS['/Game/props/a/MI_prop'] = editor.MaterialInstanceConstant('/Game/props/a/MI_prop')
+
+    with pytest.raises(Exception, match = 'In memory asset'):
+        create_material_instance('/Game/props/a')
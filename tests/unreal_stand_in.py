@@ -0,0 +1,347 @@
+"""
+A local stand-in for the `unreal` module of the editor, covering what the import scripts use.
+
+The submitted import tasks, the saved assets, the console variables and the registered callbacks are recorded, so the batching and the ordering can be tested without the editor.
+"""
+
+import sys
+import typing
+
+
+class Object:
+    """ An editor object or struct, the editor properties are also readable as attributes. """
+
+
+    def __init__(self, **properties):
+        self.__dict__.update(properties)
+
+
+    def set_editor_property(self, name: str, value):
+        setattr(self, name, value)
+
+
+    def get_editor_property(self, name: str):
+        return getattr(self, name, None)
+
+
+class Asset(Object):
+
+
+    def __init__(self, path: str, **properties):
+        super().__init__(skeleton = None, physics_asset = None, materials = [], **properties)
+        self.path = path
+
+
+    def get_path_name(self):
+        return self.path
+
+
+    def get_full_name(self):
+        return self.path
+
+
+class AssetImportTask(Object):
+
+
+    def get_objects(self):
+        return getattr(self, 'objects', [])
+
+
+class FbxImportUI(Object): pass
+class FbxStaticMeshImportData(Object): pass
+class FbxSkeletalMeshImportData(Object): pass
+class FbxAnimSequenceImportData(Object): pass
+class TextureFactory(Object): pass
+class MaterialInstanceConstantFactoryNew(Object): pass
+class SkeletalMaterial(Object): pass
+
+class AnimationAsset(Asset): pass
+class StaticMesh(Asset): pass
+class SkeletalMesh(Asset): pass
+class Texture(Asset): pass
+class MaterialInstanceConstant(Asset): pass
+
+
+class FBXImportType:
+    FBXIT_STATIC_MESH = 'FBXIT_STATIC_MESH'
+    FBXIT_SKELETAL_MESH = 'FBXIT_SKELETAL_MESH'
+    FBXIT_ANIMATION = 'FBXIT_ANIMATION'
+
+
+class TextureCompressionSettings:
+    TC_DEFAULT = 'TC_DEFAULT'
+    TC_NORMALMAP = 'TC_NORMALMAP'
+    TC_MASKS = 'TC_MASKS'
+
+
+class Array(list):
+
+
+    def __init__(self, type):
+        super().__init__()
+
+
+class Batch(typing.NamedTuple):
+
+    filenames: typing.List[str]
+
+    console_variables: typing.Dict[str, bool]
+    """ At the moment of the import. """
+
+
+class Asset_Tools:
+
+
+    def __init__(self):
+
+        self.batches: typing.List[Batch] = []
+
+        self.failing_filenames: typing.Set[str] = set()
+        """ Imported as nothing. """
+
+
+    def import_asset_tasks(self, tasks: typing.List[AssetImportTask]):
+
+        self.batches.append(Batch([task.filename for task in tasks], dict(CONSOLE_VARIABLES)))
+        IMPORTED_FILENAMES.extend(task.filename for task in tasks)
+
+        for task in tasks:
+
+            if task.filename in self.failing_filenames:
+                continue
+
+            path = Paths.combine([task.destination_path, task.destination_name])
+            ASSETS[path] = Asset(path)
+
+            task.objects = [ASSETS[path]]
+
+
+    def create_asset(self, asset_name: str, package_path: str, asset_class: type, factory: Object):
+
+        path = Paths.combine([package_path, asset_name])
+
+        # the editor does not create over an existing asset
+        if path in ASSETS:
+            return None
+
+        ASSETS[path] = asset_class(path)
+
+        return ASSETS[path]
+
+
+class AssetToolsHelpers:
+
+
+    @staticmethod
+    def get_asset_tools():
+        return ASSET_TOOLS
+
+
+class AssetData(Object): pass
+
+
+class AssetRegistry:
+
+
+    def scan_paths_synchronous(self, paths: typing.List[str], force_rescan = False):
+        SCANNED_PATHS.extend(paths)
+
+
+    def get_assets_by_path(self, package_path: str, recursive = False, include_only_on_disk_assets = False):
+        paths = ON_DISK_ASSETS if include_only_on_disk_assets else ASSETS
+        return [AssetData(package_name = path) for path in paths if path.rsplit('/', 1)[0] == package_path.rstrip('/')]
+
+
+class AssetRegistryHelpers:
+
+
+    @staticmethod
+    def get_asset_registry():
+        return AssetRegistry()
+
+
+class EditorAssetLibrary:
+
+
+    @staticmethod
+    def save_loaded_asset(asset: Asset, only_if_is_dirty = True):
+        SAVED_ASSETS.append(asset.path)
+        ON_DISK_ASSETS.add(asset.path)
+        return True
+
+
+    @staticmethod
+    def delete_asset(path: str):
+        ASSETS.pop(path, None)
+        ON_DISK_ASSETS.discard(path)
+        return True
+
+
+    @staticmethod
+    def rename_asset(source_path: str, destination_path: str):
+
+        asset = ASSETS.pop(source_path)
+        asset.path = destination_path
+        ASSETS[destination_path] = asset
+
+        if source_path in ON_DISK_ASSETS:
+            ON_DISK_ASSETS.discard(source_path)
+            ON_DISK_ASSETS.add(destination_path)
+
+        return True
+
+
+    @staticmethod
+    def consolidate_assets(asset_to_consolidate_to: Asset, assets_to_consolidate: typing.List[Asset]):
+        return True
+
+
+    @staticmethod
+    def make_directory(path: str):
+        return True
+
+
+    @staticmethod
+    def does_asset_exist(path: str):
+        return path in ASSETS
+
+
+    @staticmethod
+    def does_directory_exist(path: str):
+        return False
+
+
+class MaterialEditingLibrary:
+
+
+    @staticmethod
+    def set_material_instance_texture_parameter_value(instance: Asset, parameter_name: str, value: Asset):
+        instance.__dict__.setdefault('texture_parameters', {})[parameter_name] = value
+
+
+    @staticmethod
+    def set_material_instance_static_switch_parameter_value(instance: Asset, parameter_name: str, value: bool):
+        instance.__dict__.setdefault('static_switch_parameters', {})[parameter_name] = value
+
+
+class Paths:
+
+
+    @staticmethod
+    def combine(paths: typing.List[str]):
+        return '/'.join(path.rstrip('/') for path in paths)
+
+
+class SystemLibrary:
+
+
+    @staticmethod
+    def get_console_variable_bool_value(name: str):
+        return CONSOLE_VARIABLES.get(name, True)
+
+
+    @staticmethod
+    def execute_console_command(world, command: str):
+        CONSOLE_COMMANDS.append(command)
+        name, value = command.split()
+        CONSOLE_VARIABLES[name] = value == 'True'
+
+
+    @staticmethod
+    def is_unattended():
+        return True
+
+
+def load_asset(path: str):
+    return ASSETS.get(path)
+
+
+def is_editor():
+    return False
+
+
+def log(message):
+    LOG.append(('info', str(message)))
+
+
+def log_warning(message):
+    LOG.append(('warning', str(message)))
+
+
+def log_error(message):
+    LOG.append(('error', str(message)))
+
+
+def register_slate_post_tick_callback(callback: typing.Callable[[float], None]):
+
+    global _last_handle
+    _last_handle += 1
+
+    TICK_CALLBACKS[_last_handle] = callback
+
+    return _last_handle
+
+
+def unregister_slate_post_tick_callback(handle: int):
+    del TICK_CALLBACKS[handle]
+
+
+def register_python_shutdown_callback(callback: typing.Callable[[], None]):
+    SHUTDOWN_CALLBACKS.append(callback)
+
+
+def tick(delta_seconds = 1 / 60):
+    """ A frame of the editor. """
+    for callback in list(TICK_CALLBACKS.values()):
+        callback(delta_seconds)
+
+
+def shut_down():
+    """ The editor is closed. """
+    for callback in SHUTDOWN_CALLBACKS:
+        callback()
+
+
+def reset():
+
+    global ASSET_TOOLS, _last_handle
+
+    ASSET_TOOLS = Asset_Tools()
+
+    ASSETS.clear()
+    ON_DISK_ASSETS.clear()
+    SAVED_ASSETS.clear()
+    IMPORTED_FILENAMES.clear()
+    SCANNED_PATHS.clear()
+    CONSOLE_VARIABLES.clear()
+    CONSOLE_COMMANDS.clear()
+    TICK_CALLBACKS.clear()
+    SHUTDOWN_CALLBACKS.clear()
+    LOG.clear()
+
+    _last_handle = 0
+
+
+ASSET_TOOLS = Asset_Tools()
+
+ASSETS: typing.Dict[str, Asset] = {}
+""" The loaded assets by path, see `ON_DISK_ASSETS`. """
+
+ON_DISK_ASSETS: typing.Set[str] = set()
+""" The paths of the saved assets. """
+
+SAVED_ASSETS: typing.List[str] = []
+IMPORTED_FILENAMES: typing.List[str] = []
+SCANNED_PATHS: typing.List[str] = []
+CONSOLE_VARIABLES: typing.Dict[str, bool] = {}
+CONSOLE_COMMANDS: typing.List[str] = []
+TICK_CALLBACKS: typing.Dict[int, typing.Callable[[float], None]] = {}
+SHUTDOWN_CALLBACKS: typing.List[typing.Callable[[], None]] = []
+LOG: typing.List[typing.Tuple[str, str]] = []
+
+_last_handle = 0
+
+
+def install():
+    """ Must be done before importing the scripts, they check for `unreal` in `sys.modules`. """
+    sys.modules['unreal'] = sys.modules[__name__]
@@ -0,0 +1,76 @@
+"""
+The Unreal Engine executor for the programs that run in parallel.
+
+The remote execution client binds a fixed command port, so only one program at a time can execute in the editor.
+"""
+
+import os
+import time
+import tempfile
+
+import psutil
+
+from blend_converter.unreal.executor import Unreal
+
+
+LOCK_DIR = os.path.join(tempfile.gettempdir(), 'blend_converter')
+
+
+class Remote_Execution_Lock:
+    """ A lock file with the PID of the owner, a lock of a process that does not exist anymore is taken over. """
+
+
+    def __init__(self, port: int, poll_interval = 0.1):
+        self.path = os.path.join(LOCK_DIR, f'unreal_remote_execution_{port}.lock')
+        self.poll_interval = poll_interval
+
+
+    def is_stale(self):
+
+        try:
+            with open(self.path, encoding = 'utf-8') as f:
+                pid = int(f.read())
+        except (OSError, ValueError):
+            # being written or already removed
+            return False
+
+        return not psutil.pid_exists(pid)
+
+
+    def __enter__(self):
+
+        os.makedirs(LOCK_DIR, exist_ok = True)
+
+        while True:
+
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+
+                if self.is_stale():
+                    try:
+                        os.remove(self.path)
+                    except OSError:
+                        pass
+                    continue
+
+                time.sleep(self.poll_interval)
+                continue
+
+            with os.fdopen(fd, 'w', encoding = 'utf-8') as f:
+                f.write(str(os.getpid()))
+
+            return self
+
+
+    def __exit__(self, type, value, traceback):
+        os.remove(self.path)
+
+
+class Exclusive_Unreal(Unreal):
+    """ Waits for the other programs to finish their execution in the editor. """
+
+
+    def run(self, **kwargs):
+        with Remote_Execution_Lock(self.remote_execution_settings.command_port):
+            super().run(**kwargs)